@@ -1,15 +1,45 @@
+# Use uvloop's event loop where available; it must be installed before any loop is created
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
 from quart import Quart
 from quart_cors import cors
 import os
+import logging
+import logging.handlers
+import queue
 import redis.asyncio as redis
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
 from celery import Celery
 
 # Initialize Redis client
 redis_client = None
 
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+
 # Initialize Celery
 celery = Celery('ddi_sync', broker='redis://localhost:6379/0')
 
+# Configured at import time: the worker (celery -A app.tasks) never calls create_app, and it
+# needs the result backend for chord callbacks and the compression settings for its results
+celery.conf.update(
+    result_backend=REDIS_URL,
+    task_serializer='json',
+    accept_content=['json'],
+    result_serializer='json',
+    task_compression='zstd',
+    result_compression='zstd',
+    timezone='UTC',
+    enable_utc=True,
+    task_track_started=True,
+    task_time_limit=30 * 60,  # 30 minutes
+    task_soft_time_limit=25 * 60,  # 25 minutes
+)
+
 def create_app():
     app = Quart(__name__)
     
@@ -20,38 +50,51 @@ def create_app():
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key')
     app.config['UPLOAD_FOLDER'] = 'uploads'
     app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-    app.config['REDIS_URL'] = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
-    
-    # Celery configuration
-    celery.conf.update(
-        result_backend=app.config['REDIS_URL'],
-        task_serializer='json',
-        accept_content=['json'],
-        result_serializer='json',
-        timezone='UTC',
-        enable_utc=True,
-        task_track_started=True,
-        task_time_limit=30 * 60,  # 30 minutes
-        task_soft_time_limit=25 * 60,  # 25 minutes
-    )
+    app.config['REDIS_URL'] = REDIS_URL
+    app.config['REDIS_MAX_CONNECTIONS'] = int(os.environ.get('REDIS_MAX_CONNECTIONS', 50))
     
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
     
+    # The app's loggers (app.*) hand records to a background thread so formatting and I/O stay
+    # off the event loop. The listener writes through the root logger's handlers, or to stderr
+    # like logging's last-resort handler when there are none; levels are left as they are.
+    app_logger = logging.getLogger(__name__)
+    log_queue = queue.Queue(-1)
+    log_listener = logging.handlers.QueueListener(
+        log_queue,
+        *(logging.getLogger().handlers or [logging.StreamHandler()]),
+        respect_handler_level=True
+    )
+    app_logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    app_logger.propagate = False  # The listener already writes through the root handlers
+    log_listener.start()
+    
     # Initialize Redis connection
     @app.before_serving
     async def startup():
         global redis_client
-        redis_client = await redis.from_url(
+        # Bounded pool: coroutines wait for a free connection instead of opening new sockets
+        pool = redis.BlockingConnectionPool.from_url(
             app.config['REDIS_URL'],
-            encoding="utf-8",
-            decode_responses=True
+            max_connections=app.config['REDIS_MAX_CONNECTIONS'],
+            timeout=20,
+            decode_responses=False,  # Cached payloads are compressed bytes
+            retry=Retry(ExponentialBackoff(), 3),
+            retry_on_timeout=True
         )
+        redis_client = redis.Redis(connection_pool=pool)
+        app.redis_pool = pool
         app.redis_client = redis_client
     
     @app.after_serving
     async def shutdown():
         if redis_client:
             await redis_client.close()
+            await app.redis_pool.disconnect()
+        log_listener.stop()
+    
+    from app.middleware import ErrorHandlerMiddleware
+    ErrorHandlerMiddleware(app)
     
     from app.routes import main_bp
     app.register_blueprint(main_bp)
@@ -1,13 +1,35 @@
 """Middleware for error handling and request validation"""
-from quart import jsonify, request
+from quart import jsonify, request, current_app
 from marshmallow import ValidationError
+from werkzeug.exceptions import HTTPException
+from redis.exceptions import NoScriptError, RedisError
+from collections import defaultdict, deque
 import time
 import logging
+import hashlib
 from functools import wraps
 import asyncio
 
 logger = logging.getLogger(__name__)
 
+# Rolling-window rate limit: trim expired entries, count, record and refresh the
+# key TTL in a single atomic round trip.
+# KEYS[1] = client key, ARGV = {now, window, max_requests}
+_RATE_LUA = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local max_requests = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window)
+local n = redis.call('ZCARD', KEYS[1])
+if n >= max_requests then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now, now .. ':' .. math.random())
+redis.call('PEXPIRE', KEYS[1], math.ceil(window * 1000))
+return 1
+"""
+_RATE_SHA = hashlib.sha1(_RATE_LUA.encode()).hexdigest()
+
 class ErrorHandlerMiddleware:
     """Global error handler middleware"""
     
@@ -38,7 +60,7 @@ class ErrorHandlerMiddleware:
         @self.app.errorhandler(500)
         async def handle_internal_error(error):
             """Handle internal server errors"""
-            logger.error(f"Internal error: {error}")
+            logger.error("Internal error: %s", error)
             return jsonify({
                 'status': 'error',
                 'message': 'Internal server error'
@@ -47,19 +69,24 @@ class ErrorHandlerMiddleware:
         @self.app.errorhandler(Exception)
         async def handle_unexpected_error(error):
             """Handle unexpected errors"""
-            logger.error(f"Unexpected error: {error}", exc_info=True)
+            # Let HTTP errors (404, 405, ...) keep their own status and handlers
+            if isinstance(error, HTTPException):
+                return error
+            
+            logger.error("Unexpected error: %s", error, exc_info=True)
             return jsonify({
                 'status': 'error',
-                'message': 'An unexpected error occurred'
+                'message': str(error) or 'An unexpected error occurred'
             }), 500
 
 def validate_request(schema_class):
     """Decorator for request validation"""
     def decorator(f):
+        # Schemas are stateless across loads; build the field tables once per view
+        schema = schema_class()
+        
         @wraps(f)
         async def decorated_function(*args, **kwargs):
-            schema = schema_class()
-            
             try:
                 # Get request data
                 if request.method in ['POST', 'PUT', 'PATCH']:
@@ -81,7 +108,7 @@ def validate_request(schema_class):
                     'errors': e.messages
                 }), 400
             except Exception as e:
-                logger.error(f"Request validation error: {e}")
+                logger.error("Request validation error: %s", e)
                 return jsonify({
                     'status': 'error',
                     'message': 'Invalid request'
@@ -90,34 +117,64 @@ def validate_request(schema_class):
         return decorated_function
     return decorator
 
+class _LocalRateWindow:
+    """Per-worker rolling window, used only while Redis is unreachable"""
+    
+    def __init__(self, max_requests, window):
+        self.max_requests = max_requests
+        self.window = window
+        self.request_counts = defaultdict(deque)
+        self.next_sweep = time.monotonic() + window
+    
+    def allow(self, client_id):
+        """Record a request and return whether it is within the limit"""
+        now = time.monotonic()
+        
+        # Periodically drop clients with no requests inside the window
+        if now >= self.next_sweep:
+            for key in [k for k, dq in self.request_counts.items() if now - dq[-1] > self.window]:
+                del self.request_counts[key]
+            self.next_sweep = now + self.window
+        
+        timestamps = self.request_counts[client_id]
+        while timestamps and now - timestamps[0] > self.window:
+            timestamps.popleft()
+        
+        if len(timestamps) >= self.max_requests:
+            return False
+        
+        timestamps.append(now)
+        return True
+
 def rate_limit(max_requests=100, window=60):
-    """Rate limiting decorator"""
+    """Rate limiting decorator backed by a Redis sorted-set rolling window"""
     def decorator(f):
-        # Simple in-memory rate limiting (use Redis in production)
-        request_counts = {}
+        local_window = _LocalRateWindow(max_requests, window)
         
         @wraps(f)
         async def decorated_function(*args, **kwargs):
             # Get client identifier (IP address)
             client_id = request.remote_addr
-            current_time = time.time()
+            redis_client = current_app.redis_client
+            key = f"rl:{f.__name__}:{client_id}"
+            script_args = (time.time(), window, max_requests)
             
-            # Clean old entries
-            request_counts[client_id] = [
-                timestamp for timestamp in request_counts.get(client_id, [])
-                if current_time - timestamp < window
-            ]
+            try:
+                try:
+                    allowed = await redis_client.evalsha(_RATE_SHA, 1, key, *script_args)
+                except NoScriptError:
+                    # First call against this Redis instance; EVAL also caches the script
+                    allowed = await redis_client.eval(_RATE_LUA, 1, key, *script_args)
+            except RedisError as e:
+                logger.warning("Rate limiting falling back to in-memory window: %s", e)
+                allowed = local_window.allow(client_id)
             
-            # Check rate limit
-            if len(request_counts.get(client_id, [])) >= max_requests:
+            if not allowed:
                 return jsonify({
                     'status': 'error',
                     'message': 'Rate limit exceeded'
                 }), 429
             
-            # Record request
-            request_counts.setdefault(client_id, []).append(current_time)
-            
             return await f(*args, **kwargs)
         
         return decorated_function
@@ -174,16 +231,15 @@ class RequestLoggingMiddleware:
         async def log_request():
             """Log incoming requests"""
             request.start_time = time.time()
-            logger.info(f"Request: {request.method} {request.path}")
+            logger.info("Request: %s %s", request.method, request.path)
         
         @self.app.after_request
         async def log_response(response):
             """Log responses"""
             duration = time.time() - request.start_time
             logger.info(
-                f"Response: {request.method} {request.path} - "
-                f"Status: {response.status_code} - "
-                f"Duration: {duration:.3f}s"
+                "Response: %s %s - Status: %s - Duration: %.3fs",
+                request.method, request.path, response.status_code, duration
             )
             
             # Add performance headers
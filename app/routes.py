@@ -1,54 +1,172 @@
-from quart import Blueprint, jsonify, request, render_template, current_app
+from quart import Blueprint, Response, request, render_template, current_app
 import pandas as pd
-import json
+from pyarrow import csv as pacsv
+import orjson
 from werkzeug.utils import secure_filename
 import os
 import asyncio
 import aiofiles
+from functools import partial
 from concurrent.futures import ThreadPoolExecutor
-from app.services.cloud_providers import AWSProvider, AzureProvider, GCPProvider, AlibabaProvider
+from app.services.cloud_providers import AWSProviderAsync, AzureProvider, GCPProvider, AlibabaProvider, close_aws_clients
 from app.services.ddi_service import DDIService
-from app.services.infoblox_wapi import InfobloxWAPI
-from app.services.aws_import import AWSImporter
+from app.services.infoblox_wapi_async import InfobloxWAPIAsync
+from app.services.aws_import import AWSImporter, network_key
 from app.services.attribute_mapper import AttributeMapper
+from app.services.cache import cache_key, pack_cache, unpack_cache
 from app import celery
+from celery import chord
 import hashlib
+import uuid
 import time
 
 main_bp = Blueprint('main', __name__)
 
-ALLOWED_EXTENSIONS = {'csv', 'xlsx', 'xls'}
+ALLOWED_EXTENSIONS = ('.csv', '.xlsx', '.xls')
 
-# Thread pool for CPU-bound operations
-executor = ThreadPoolExecutor(max_workers=4)
+# Thread pool for CPU-bound operations (pyarrow releases the GIL while parsing)
+executor = ThreadPoolExecutor(max_workers=os.cpu_count())
 
-# Global InfoBlox client (will be initialized when configured)
-infoblox_client = None
+# Uploads are streamed to disk in filesystem-block-sized chunks
+UPLOAD_CHUNK_SIZE = 1 << 16
+
+# Networks per import task when a large import is split across workers
+IMPORT_CHUNK_SIZE = 500
+
+# A view scan costs one request per 1000 networks and saves the import tasks one lookup
+# request per 100 subnets, so it is only worth it for views up to 10x the import's size
+PREFETCH_VIEW_RATIO = 10
+
+# InfoBlox client built from the stored config, refreshed at most once per TTL
+INFOBLOX_CLIENT_TTL = 60
+_ib_cache = {'client': None, 'config': None, 'expires': 0.0}
+_ib_lock = asyncio.Lock()
 
 def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return filename.lower().endswith(ALLOWED_EXTENSIONS)
 
 async def get_infoblox_client():
     """Get or create InfoBlox client"""
-    global infoblox_client
-    if not infoblox_client:
-        # Try to get from Redis cache first
+    loop = asyncio.get_event_loop()
+    if _ib_cache['client'] and loop.time() < _ib_cache['expires']:
+        return _ib_cache['client']
+    
+    async with _ib_lock:
+        # Another coroutine may have refreshed the client while we waited
+        if _ib_cache['client'] and loop.time() < _ib_cache['expires']:
+            return _ib_cache['client']
+        
         redis_client = current_app.redis_client
         config_str = await redis_client.get('infoblox_config')
         
         if config_str:
-            config = json.loads(config_str)
-            infoblox_client = InfobloxWAPI(
-                config['host'],
-                config['username'],
-                config['password']
-            )
-    return infoblox_client
+            # Keep the existing client (and its open connections) if the config is unchanged
+            if config_str != _ib_cache['config']:
+                config = orjson.loads(config_str)
+                await set_infoblox_client(InfobloxWAPIAsync(
+                    config['host'],
+                    config['username'],
+                    config['password']
+                ), config_str)
+            _ib_cache['expires'] = loop.time() + INFOBLOX_CLIENT_TTL
+        else:
+            await set_infoblox_client(None, None)
+    return _ib_cache['client']
+
+async def set_infoblox_client(client, config_str):
+    """Replace the cached InfoBlox client, closing the previous connection pool"""
+    old_client = _ib_cache['client']
+    _ib_cache['client'] = client
+    _ib_cache['config'] = config_str
+    _ib_cache['expires'] = asyncio.get_event_loop().time() + INFOBLOX_CLIENT_TTL
+    if old_client and old_client is not client:
+        await old_client.close()
+
+@main_bp.after_app_serving
+async def close_infoblox_client():
+    await set_infoblox_client(None, None)
+    await close_aws_clients()
+
+def json_response(obj, status=200):
+    """Build a JSON response serialized with orjson"""
+    return Response(orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS), status=status, mimetype='application/json')
+
+async def save_upload(file, filepath):
+    """Stream an uploaded file to disk and return its SHA-256 digest"""
+    digest = hashlib.sha256()
+    async with aiofiles.open(filepath, 'wb') as f:
+        while chunk := file.stream.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+            await f.write(chunk)
+    return digest.hexdigest()
+
+async def cache_get(key):
+    """Fetch and decode a cache entry, None on a miss"""
+    raw = await current_app.redis_client.get(key)
+    return unpack_cache(raw) if raw is not None else None
+
+async def cache_set(key, value, ttl):
+    """Store a value in the cache for ttl seconds"""
+    await current_app.redis_client.setex(key, ttl, pack_cache(value))
+
+async def cache_delete(*keys):
+    """Invalidate cache entries"""
+    await current_app.redis_client.delete(*keys)
+
+async def cached_fetch(key, ttl, fn, *args):
+    """Return a cached value, or await fn(*args) and cache the result for ttl seconds"""
+    cached_data = await cache_get(key)
+    if cached_data is not None:
+        return cached_data
+    
+    data = await fn(*args)
+    await cache_set(key, data, ttl)
+    return data
 
-async def cache_key(prefix, *args):
-    """Generate cache key"""
-    key_data = f"{prefix}:{':'.join(str(arg) for arg in args)}"
-    return hashlib.md5(key_data.encode()).hexdigest()
+def match_existing(ib_networks, subnets):
+    """Map each subnet already in InfoBlox to the part of its record bulk_upsert needs"""
+    refs = {network_key(cidr): record['_ref'] for cidr, record in ib_networks.items()}
+    return {
+        subnet: {'_ref': refs[key]}
+        for subnet in subnets
+        if (key := network_key(subnet)) in refs
+    }
+
+async def prefetch_existing(network_view, networks):
+    """Resolve which networks already exist with one scan of the view, once per import
+    
+    Returns None when InfoBlox is not configured or the view is too large for the scan to pay
+    off; the import tasks then look their subnets up chunk by chunk instead.
+    """
+    client = await get_infoblox_client()
+    if not client or not networks:
+        return None
+    
+    ib_networks = await client.index_networks(
+        network_view,
+        max_networks=len(networks) * PREFETCH_VIEW_RATIO
+    )
+    if ib_networks is None:
+        return None
+    
+    # Parsing every CIDR on both sides is CPU-bound, so match in the thread pool
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(
+        executor,
+        match_existing,
+        ib_networks,
+        [network['subnet'] for network in networks]
+    )
+
+def bulk_send(task_name, args_list, callback_name, task_id=None):
+    """Publish tasks as a chord header joined by a callback task
+    
+    The header goes out through a single acquired producer, but kombu's Redis transport still
+    sends each message on its own (one LPUSH per task), so this saves no broker round trips.
+    The returned result is the callback's; task_id lets the caller choose that id up front.
+    """
+    header = [celery.signature(task_name, args=args) for args in args_list]
+    return chord(header)(celery.signature(callback_name), task_id=task_id)
 
 @main_bp.route('/')
 async def index():
@@ -56,442 +174,410 @@ async def index():
 
 @main_bp.route('/api/infoblox/sync', methods=['POST'])
 async def sync_infoblox():
-    try:
-        data = await request.json
-        # Queue task for background processing
-        task = celery.send_task('sync_infoblox_task', args=[data])
-        
-        return jsonify({
-            'status': 'success', 
-            'message': 'Sync task queued',
-            'task_id': task.id
-        })
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+    data = await request.json
+    # Queue task for background processing
+    task = celery.send_task('sync_infoblox_task', args=[data])
+    
+    return json_response({
+        'status': 'success', 
+        'message': 'Sync task queued',
+        'task_id': task.id
+    })
 
 @main_bp.route('/api/cloud/<provider>/data', methods=['GET'])
 async def get_cloud_data(provider):
-    try:
-        providers = {
-            'aws': AWSProvider,
-            'azure': AzureProvider,
-            'gcp': GCPProvider,
-            'alibaba': AlibabaProvider
-        }
-        
-        if provider not in providers:
-            return jsonify({'status': 'error', 'message': 'Invalid provider'}), 400
-        
-        # Check cache first
-        redis_client = current_app.redis_client
-        cache_key_str = await cache_key('cloud_data', provider)
-        cached_data = await redis_client.get(cache_key_str)
-        
-        if cached_data:
-            return jsonify({'status': 'success', 'data': json.loads(cached_data), 'cached': True})
-        
-        # Get data in background thread (cloud SDKs are not async)
+    providers = {
+        'aws': AWSProviderAsync,
+        'azure': AzureProvider,
+        'gcp': GCPProvider,
+        'alibaba': AlibabaProvider
+    }
+    
+    if provider not in providers:
+        return json_response({'status': 'error', 'message': 'Invalid provider'}, 400)
+    
+    # Check cache first
+    cache_key_str = cache_key('cloud_data', provider)
+    cached_data = await cache_get(cache_key_str)
+    
+    if cached_data is not None:
+        return json_response({'status': 'success', 'data': cached_data, 'cached': True})
+    
+    cloud_provider = providers[provider]()
+    if asyncio.iscoroutinefunction(cloud_provider.get_ddi_data):
+        data = await cloud_provider.get_ddi_data()
+    else:
+        # Get data in background thread (these cloud SDKs are not async)
         loop = asyncio.get_event_loop()
-        cloud_provider = providers[provider]()
         data = await loop.run_in_executor(executor, cloud_provider.get_ddi_data)
-        
-        # Cache for 5 minutes
-        await redis_client.setex(cache_key_str, 300, json.dumps(data))
-        
-        return jsonify({'status': 'success', 'data': data})
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+    
+    # Cache for 5 minutes
+    await cache_set(cache_key_str, data, 300)
+    
+    return json_response({'status': 'success', 'data': data})
 
 @main_bp.route('/api/upload', methods=['POST'])
 async def upload_file():
-    try:
-        files = await request.files
-        if 'file' not in files:
-            return jsonify({'status': 'error', 'message': 'No file part'}), 400
+    files = await request.files
+    if 'file' not in files:
+        return json_response({'status': 'error', 'message': 'No file part'}, 400)
+    
+    file = files['file']
+    if file.filename == '':
+        return json_response({'status': 'error', 'message': 'No selected file'}, 400)
+    
+    if file and allowed_file(file.filename):
+        filename = secure_filename(file.filename)
+        filepath = os.path.join('uploads', filename)
+        
+        # Save file asynchronously
+        digest = await save_upload(file, filepath)
+        
+        # Skip parsing when identical content was uploaded recently
+        cache_key_str = cache_key('upload', digest)
+        cached_data = await cache_get(cache_key_str)
+        if cached_data is not None:
+            return json_response({'status': 'success', 'data': cached_data, 'cached': True})
+        
+        # Process file in thread pool
+        loop = asyncio.get_event_loop()
+        if filename.endswith('.csv'):
+            table = await loop.run_in_executor(executor, pacsv.read_csv, filepath)
+            data = table.to_pylist()
+        else:
+            df = await loop.run_in_executor(
+                executor,
+                partial(pd.read_excel, filepath, engine='calamine')
+            )
+            data = df.to_dict(orient='records')
         
-        file = files['file']
-        if file.filename == '':
-            return jsonify({'status': 'error', 'message': 'No selected file'}), 400
+        # Cache parsed content for 10 minutes
+        await cache_set(cache_key_str, data, 600)
         
-        if file and allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            filepath = os.path.join('uploads', filename)
-            
-            # Save file asynchronously
-            async with aiofiles.open(filepath, 'wb') as f:
-                await f.write(await file.read())
-            
-            # Process file in thread pool
-            loop = asyncio.get_event_loop()
-            if filename.endswith('.csv'):
-                df = await loop.run_in_executor(executor, pd.read_csv, filepath)
-            else:
-                df = await loop.run_in_executor(executor, pd.read_excel, filepath)
-            
-            data = df.to_dict(orient='records')
-            return jsonify({'status': 'success', 'data': data})
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+        return json_response({'status': 'success', 'data': data})
 
 @main_bp.route('/api/compare', methods=['POST'])
 async def compare_data():
-    try:
-        data = await request.json
-        # Queue comparison task
-        task = celery.send_task('compare_data_task', args=[data])
-        
-        return jsonify({
-            'status': 'success',
-            'message': 'Comparison task queued',
-            'task_id': task.id
-        })
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+    data = await request.json
+    # Queue comparison task
+    task = celery.send_task('compare_data_task', args=[data])
+    
+    return json_response({
+        'status': 'success',
+        'message': 'Comparison task queued',
+        'task_id': task.id
+    })
 
 @main_bp.route('/api/sync', methods=['POST'])
 async def sync_data():
-    try:
-        data = await request.json
-        # Queue sync task
-        task = celery.send_task('sync_data_task', args=[data])
-        
-        return jsonify({
-            'status': 'success',
-            'message': 'Sync task queued',
-            'task_id': task.id
-        })
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+    data = await request.json
+    # Queue sync task
+    task = celery.send_task('sync_data_task', args=[data])
+    
+    return json_response({
+        'status': 'success',
+        'message': 'Sync task queued',
+        'task_id': task.id
+    })
 
 @main_bp.route('/api/infoblox/configure', methods=['POST'])
 async def configure_infoblox():
     """Configure InfoBlox connection"""
-    try:
-        data = await request.json
-        host = data.get('host')
-        username = data.get('username')
-        password = data.get('password')
+    data = await request.json
+    host = data.get('host')
+    username = data.get('username')
+    password = data.get('password')
+    
+    # Test connection asynchronously
+    test_client = InfobloxWAPIAsync(host, username, password)
+    connection_valid = await test_client.test_connection()
+    
+    if connection_valid:
+        # Save to Redis
+        config = {
+            'host': host,
+            'username': username,
+            'password': password
+        }
+        config_str = orjson.dumps(config)
         
-        # Test connection asynchronously
-        loop = asyncio.get_event_loop()
-        test_client = InfobloxWAPI(host, username, password)
-        connection_valid = await loop.run_in_executor(
-            executor, 
-            test_client.test_connection
-        )
+        # Drop metadata cached from a previously configured grid
+        stale_keys = [cache_key('network_views'), cache_key('extensible_attributes')]
+        redis_client = current_app.redis_client
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.set('infoblox_config', config_str)
+            pipe.delete(*stale_keys)
+            await pipe.execute()
         
-        if connection_valid:
-            # Save to Redis
-            config = {
-                'host': host,
-                'username': username,
-                'password': password
-            }
-            redis_client = current_app.redis_client
-            await redis_client.set('infoblox_config', json.dumps(config))
-            
-            global infoblox_client
-            infoblox_client = test_client
-            
-            return jsonify({'status': 'success', 'message': 'InfoBlox configured successfully'})
-        else:
-            return jsonify({'status': 'error', 'message': 'Failed to connect to InfoBlox'}), 400
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+        await set_infoblox_client(test_client, config_str)
+        
+        return json_response({'status': 'success', 'message': 'InfoBlox configured successfully'})
+    else:
+        await test_client.close()
+        return json_response({'status': 'error', 'message': 'Failed to connect to InfoBlox'}, 400)
 
 @main_bp.route('/api/infoblox/network-views', methods=['GET'])
 async def get_network_views():
     """Get InfoBlox network views"""
-    try:
-        client = await get_infoblox_client()
-        if not client:
-            return jsonify({'status': 'error', 'message': 'InfoBlox not configured'}), 400
-        
-        # Check cache
-        redis_client = current_app.redis_client
-        cache_key_str = await cache_key('network_views')
-        cached_data = await redis_client.get(cache_key_str)
-        
-        if cached_data:
-            return jsonify({'status': 'success', 'data': json.loads(cached_data)})
-        
-        # Get data in thread pool
-        loop = asyncio.get_event_loop()
-        views = await loop.run_in_executor(executor, client.get_network_views)
-        
-        # Cache for 10 minutes
-        await redis_client.setex(cache_key_str, 600, json.dumps(views))
-        
-        return jsonify({'status': 'success', 'data': views})
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+    client = await get_infoblox_client()
+    if not client:
+        return json_response({'status': 'error', 'message': 'InfoBlox not configured'}, 400)
+    
+    # Cached for 10 minutes
+    views = await cached_fetch(cache_key('network_views'), 600, client.get_network_views)
+    
+    return json_response({'status': 'success', 'data': views})
 
 @main_bp.route('/api/infoblox/extensible-attributes', methods=['GET'])
 async def get_extensible_attributes():
     """Get InfoBlox extensible attributes"""
-    try:
-        client = await get_infoblox_client()
-        if not client:
-            return jsonify({'status': 'error', 'message': 'InfoBlox not configured'}), 400
-        
-        # Check cache
-        redis_client = current_app.redis_client
-        cache_key_str = await cache_key('extensible_attributes')
-        cached_data = await redis_client.get(cache_key_str)
-        
-        if cached_data:
-            return jsonify({'status': 'success', 'data': json.loads(cached_data)})
-        
-        # Get data in thread pool
-        loop = asyncio.get_event_loop()
-        attrs = await loop.run_in_executor(executor, client.get_extensible_attributes)
-        
-        # Cache for 10 minutes
-        await redis_client.setex(cache_key_str, 600, json.dumps(attrs))
-        
-        return jsonify({'status': 'success', 'data': attrs})
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+    client = await get_infoblox_client()
+    if not client:
+        return json_response({'status': 'error', 'message': 'InfoBlox not configured'}, 400)
+    
+    # Cached for 10 minutes
+    attrs = await cached_fetch(cache_key('extensible_attributes'), 600, client.get_extensible_attributes)
+    
+    return json_response({'status': 'success', 'data': attrs})
 
 @main_bp.route('/api/infoblox/networks', methods=['GET'])
 async def get_infoblox_networks():
     """Get InfoBlox networks"""
-    try:
-        client = await get_infoblox_client()
-        if not client:
-            return jsonify({'status': 'error', 'message': 'InfoBlox not configured'}), 400
-        
-        network_view = request.args.get('network_view', 'default')
-        
-        # Check cache
-        redis_client = current_app.redis_client
-        cache_key_str = await cache_key('networks', network_view)
-        cached_data = await redis_client.get(cache_key_str)
-        
-        if cached_data:
-            return jsonify({'status': 'success', 'data': json.loads(cached_data)})
-        
-        # Get data in thread pool
-        loop = asyncio.get_event_loop()
-        networks = await loop.run_in_executor(
-            executor, 
-            client.get_networks, 
-            network_view
-        )
-        
-        # Cache for 5 minutes
-        await redis_client.setex(cache_key_str, 300, json.dumps(networks))
-        
-        return jsonify({'status': 'success', 'data': networks})
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+    client = await get_infoblox_client()
+    if not client:
+        return json_response({'status': 'error', 'message': 'InfoBlox not configured'}, 400)
+    
+    network_view = request.args.get('network_view', 'default')
+    
+    # Cached for 5 minutes
+    networks = await cached_fetch(
+        cache_key('networks', network_view),
+        300,
+        client.get_networks,
+        network_view
+    )
+    
+    return json_response({'status': 'success', 'data': networks})
 
 @main_bp.route('/api/aws/upload', methods=['POST'])
 async def upload_aws_file():
     """Upload and parse AWS network export file"""
-    try:
-        files = await request.files
-        if 'file' not in files:
-            return jsonify({'status': 'error', 'message': 'No file part'}), 400
+    files = await request.files
+    if 'file' not in files:
+        return json_response({'status': 'error', 'message': 'No file part'}, 400)
+    
+    file = files['file']
+    if file.filename == '':
+        return json_response({'status': 'error', 'message': 'No selected file'}, 400)
+    
+    if file and allowed_file(file.filename):
+        filename = secure_filename(file.filename)
+        filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+        
+        # Save file asynchronously
+        digest = await save_upload(file, filepath)
+        
+        # Skip parsing when identical content was uploaded recently
+        cache_key_str = cache_key('aws_upload', digest)
+        cached_data = await cache_get(cache_key_str)
+        if cached_data is not None:
+            return json_response({'status': 'success', 'data': cached_data, 'cached': True})
+        
+        # Parse, validate and process in a single thread pool hop
+        loop = asyncio.get_event_loop()
+        importer = AWSImporter()
+        networks, errors, unique_tags = await loop.run_in_executor(
+            executor,
+            importer.load,
+            filepath
+        )
         
-        file = files['file']
-        if file.filename == '':
-            return jsonify({'status': 'error', 'message': 'No selected file'}), 400
+        if errors:
+            return json_response({'status': 'error', 'message': 'Invalid file format', 'errors': errors}, 400)
         
-        if file and allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-            
-            # Save file asynchronously
-            async with aiofiles.open(filepath, 'wb') as f:
-                await f.write(await file.read())
-            
-            # Process in thread pool
-            loop = asyncio.get_event_loop()
-            importer = AWSImporter()
-            
-            # Parse file
-            df = await loop.run_in_executor(executor, importer.parse_file, filepath)
-            
-            # Validate file
-            is_valid, errors = await loop.run_in_executor(
-                executor, 
-                importer.validate_file, 
-                df
-            )
-            
-            if not is_valid:
-                return jsonify({'status': 'error', 'message': 'Invalid file format', 'errors': errors}), 400
-            
-            # Process data
-            networks = await loop.run_in_executor(
-                executor, 
-                importer.process_aws_data, 
-                df
-            )
-            
-            # Get unique tags for mapping
-            all_tags = set()
-            for net in networks:
-                all_tags.update(net['tags'].keys())
-            
-            return jsonify({
-                'status': 'success',
-                'data': {
-                    'networks': networks,
-                    'total_count': len(networks),
-                    'unique_tags': list(all_tags)
-                }
-            })
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+        result = {
+            'networks': networks,
+            'total_count': len(networks),
+            'unique_tags': unique_tags
+        }
+        
+        # Cache parsed content for 10 minutes
+        await cache_set(cache_key_str, result, 600)
+        
+        return json_response({'status': 'success', 'data': result})
 
 @main_bp.route('/api/aws/dry-run', methods=['POST'])
 async def aws_dry_run():
     """Perform dry run comparison between AWS and InfoBlox"""
-    try:
-        data = await request.json
-        aws_networks = data.get('networks', [])
-        network_view = data.get('network_view', 'default')
-        
-        client = await get_infoblox_client()
-        if not client:
-            return jsonify({'status': 'error', 'message': 'InfoBlox not configured'}), 400
-        
-        # Get InfoBlox networks in thread pool
-        loop = asyncio.get_event_loop()
-        ib_networks = await loop.run_in_executor(
-            executor, 
-            client.get_networks, 
-            network_view
-        )
-        
-        # Compare in thread pool
-        importer = AWSImporter()
-        comparison = await loop.run_in_executor(
-            executor,
-            importer.compare_with_infoblox,
-            aws_networks,
-            ib_networks
-        )
-        
-        return jsonify({'status': 'success', 'data': comparison})
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+    data = await request.json
+    aws_networks = data.get('networks', [])
+    network_view = data.get('network_view', 'default')
+    
+    client = await get_infoblox_client()
+    if not client:
+        return json_response({'status': 'error', 'message': 'InfoBlox not configured'}, 400)
+    
+    # Get InfoBlox networks (shares the networks endpoint cache)
+    ib_networks = await cached_fetch(
+        cache_key('networks', network_view),
+        300,
+        client.get_networks,
+        network_view
+    )
+    
+    # Compare in thread pool
+    loop = asyncio.get_event_loop()
+    importer = AWSImporter()
+    comparison = await loop.run_in_executor(
+        executor,
+        importer.compare_with_infoblox,
+        aws_networks,
+        ib_networks
+    )
+    
+    return json_response({'status': 'success', 'data': comparison})
 
 @main_bp.route('/api/aws/attribute-mappings', methods=['POST'])
 async def get_attribute_mappings():
     """Get attribute mapping suggestions"""
-    try:
-        data = await request.json
-        aws_tags = data.get('tags', [])
-        
-        client = await get_infoblox_client()
-        if not client:
-            return jsonify({'status': 'error', 'message': 'InfoBlox not configured'}), 400
-        
-        # Get InfoBlox extensible attributes
-        loop = asyncio.get_event_loop()
-        ib_attrs = await loop.run_in_executor(
-            executor, 
-            client.get_extensible_attributes
-        )
-        ib_attr_names = [attr['name'] for attr in ib_attrs]
-        
-        # Get mapping suggestions in thread pool
-        mapper = AttributeMapper()
-        mappings = await loop.run_in_executor(
-            executor,
-            mapper.create_mapping_suggestions,
-            aws_tags,
-            ib_attr_names
-        )
-        
-        return jsonify({'status': 'success', 'data': mappings})
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+    data = await request.json
+    aws_tags = data.get('tags', [])
+    
+    client = await get_infoblox_client()
+    if not client:
+        return json_response({'status': 'error', 'message': 'InfoBlox not configured'}, 400)
+    
+    # Get InfoBlox extensible attributes (shares the extensible attributes cache)
+    ib_attrs = await cached_fetch(
+        cache_key('extensible_attributes'),
+        600,
+        client.get_extensible_attributes
+    )
+    ib_attr_names = [attr['name'] for attr in ib_attrs]
+    
+    # Get mapping suggestions in thread pool
+    loop = asyncio.get_event_loop()
+    mapper = AttributeMapper()
+    mappings = await loop.run_in_executor(
+        executor,
+        mapper.create_mapping_suggestions,
+        aws_tags,
+        ib_attr_names
+    )
+    
+    return json_response({'status': 'success', 'data': mappings})
 
 @main_bp.route('/api/infoblox/create-attribute', methods=['POST'])
 async def create_extensible_attribute():
     """Create new extensible attribute in InfoBlox"""
-    try:
-        data = await request.json
-        name = data.get('name')
-        attr_type = data.get('type', 'STRING')
-        comment = data.get('comment', '')
-        
-        client = await get_infoblox_client()
-        if not client:
-            return jsonify({'status': 'error', 'message': 'InfoBlox not configured'}), 400
-        
-        # Create attribute in thread pool
-        loop = asyncio.get_event_loop()
-        success = await loop.run_in_executor(
-            executor,
-            client.create_extensible_attribute,
-            name,
-            attr_type,
-            comment
-        )
-        
-        if success:
-            # Clear cache
-            redis_client = current_app.redis_client
-            cache_key_str = await cache_key('extensible_attributes')
-            await redis_client.delete(cache_key_str)
-            
-            return jsonify({'status': 'success', 'message': f'Attribute {name} created successfully'})
-        else:
-            return jsonify({'status': 'error', 'message': 'Failed to create attribute'}), 400
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+    data = await request.json
+    name = data.get('name')
+    attr_type = data.get('type', 'STRING')
+    comment = data.get('comment', '')
+    
+    client = await get_infoblox_client()
+    if not client:
+        return json_response({'status': 'error', 'message': 'InfoBlox not configured'}, 400)
+    
+    success = await client.create_extensible_attribute(name, attr_type, comment)
+    
+    if success:
+        # Clear cache
+        cache_key_str = cache_key('extensible_attributes')
+        await cache_delete(cache_key_str)
+        
+        return json_response({'status': 'success', 'message': f'Attribute {name} created successfully'})
+    else:
+        return json_response({'status': 'error', 'message': 'Failed to create attribute'}, 400)
 
 @main_bp.route('/api/aws/import', methods=['POST'])
 async def import_aws_networks():
     """Import AWS networks to InfoBlox"""
-    try:
-        data = await request.json
-        
-        # Queue import task for background processing
-        task = celery.send_task('import_networks_task', args=[data])
-        
-        return jsonify({
-            'status': 'success',
-            'message': 'Import task queued',
-            'task_id': task.id
-        })
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+    data = await request.json
+    networks = data.get('networks', [])
+    existing = await prefetch_existing(data.get('network_view', 'default'), networks)
+    
+    # Queue import task(s) for background processing
+    if len(networks) > IMPORT_CHUNK_SIZE:
+        # Chunks report progress and spill errors under the merge task's id, the one the client polls
+        import_id = str(uuid.uuid4())
+        chunks = [networks[i:i + IMPORT_CHUNK_SIZE] for i in range(0, len(networks), IMPORT_CHUNK_SIZE)]
+        args_list = [
+            [{
+                **data,
+                'networks': chunk,
+                'import_id': import_id,
+                'import_total': len(networks),
+                # Each chunk only carries the records for its own subnets
+                'existing': None if existing is None else {
+                    network['subnet']: existing[network['subnet']]
+                    for network in chunk
+                    if network['subnet'] in existing
+                }
+            }]
+            for chunk in chunks
+        ]
+        # Kombu is synchronous, so publish the chunks from the thread pool
+        loop = asyncio.get_event_loop()
+        task = await loop.run_in_executor(
+            executor,
+            partial(
+                bulk_send,
+                'import_networks_task',
+                args_list,
+                'merge_import_results_task',
+                task_id=import_id
+            )
+        )
+    else:
+        task = celery.send_task('import_networks_task', args=[{**data, 'existing': existing}])
+    
+    return json_response({
+        'status': 'success',
+        'message': 'Import task queued',
+        'task_id': task.id
+    })
 
 @main_bp.route('/api/task/<task_id>', methods=['GET'])
 async def get_task_status(task_id):
     """Get status of a background task"""
-    try:
-        task = celery.AsyncResult(task_id)
-        
-        if task.state == 'PENDING':
-            response = {
-                'state': task.state,
-                'status': 'Task is waiting to be processed...'
-            }
-        elif task.state == 'SUCCESS':
-            response = {
-                'state': task.state,
-                'result': task.result
-            }
-        elif task.state == 'FAILURE':
-            response = {
-                'state': task.state,
-                'error': str(task.info)
-            }
-        else:
-            response = {
-                'state': task.state,
-                'current': task.info.get('current', 0),
-                'total': task.info.get('total', 1),
-                'status': task.info.get('status', '')
-            }
-        
-        return jsonify(response)
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
\ No newline at end of file
+    # Finished tasks never change, so repeat polls are served from the cache
+    cache_key_str = cache_key('task_status', task_id)
+    cached_data = await cache_get(cache_key_str)
+    if cached_data is not None:
+        return json_response(cached_data)
+    
+    # Read state and result in a single result-backend lookup
+    loop = asyncio.get_event_loop()
+    meta = await loop.run_in_executor(executor, celery.backend.get_task_meta, task_id)
+    state = meta['status']
+    
+    if state == 'PENDING':
+        response = {
+            'state': state,
+            'status': 'Task is waiting to be processed...'
+        }
+    elif state == 'SUCCESS':
+        response = {
+            'state': state,
+            'result': meta['result']
+        }
+    elif state == 'FAILURE':
+        response = {
+            'state': state,
+            'error': str(meta['result'])
+        }
+    else:
+        info = meta['result'] if isinstance(meta['result'], dict) else {}
+        response = {
+            'state': state,
+            'current': info.get('current', 0),
+            'total': info.get('total', 1),
+            'status': info.get('status', '')
+        }
+    
+    if state in ('SUCCESS', 'FAILURE'):
+        # Cache final status for 5 minutes
+        await cache_set(cache_key_str, response, 300)
+    
+    return json_response(response)
\ No newline at end of file
@@ -3,6 +3,17 @@ from marshmallow import Schema, fields, validate, validates, ValidationError
 import ipaddress
 import re
 
+# str.translate table deleting ASCII control characters (0x00-0x1F, 0x7F)
+_CTRL_TABLE = dict.fromkeys(range(0x20))
+_CTRL_TABLE[0x7F] = None
+_TAG_KEY_RE = re.compile(r'^[\w\s\-\.:/+=@]*$')
+
+_ALLOWED_EXTS = frozenset({'csv', 'xlsx', 'xls'})
+
+# IPv4 ranges rejected for import, as inclusive 32-bit integer bounds
+_MULTICAST_RANGE = (0xE0000000, 0xEFFFFFFF)  # 224.0.0.0/4
+_RESERVED_RANGE = (0xF0000000, 0xFFFFFFFF)   # 240.0.0.0/4
+
 class NetworkSchema(Schema):
     """Schema for validating network data"""
     subnet = fields.Str(required=True, validate=validate.Regexp(
@@ -17,16 +28,32 @@ class NetworkSchema(Schema):
     @validates('subnet')
     def validate_subnet(self, value):
         """Validate subnet is a valid IP network"""
-        try:
-            network = ipaddress.ip_network(value, strict=False)
-            # Check for valid subnet ranges
-            if network.prefixlen < 8 or network.prefixlen > 32:
-                raise ValidationError('Subnet prefix must be between /8 and /32')
-            # Check for reserved networks
-            if network.is_reserved or network.is_multicast:
+        # Plain ASCII digits only: \d and int() also accept other Unicode digits, signs,
+        # whitespace and underscores, which ipaddress rejects
+        ip, sep, prefix = value.partition('/')
+        parts = ip.split('.')
+        if not sep:
+            prefix = '32'  # ipaddress treats a bare address as a /32
+        if not value.isascii() or not prefix.isdigit() or not all(o.isdigit() for o in parts):
+            raise ValidationError(f'Invalid subnet: {value}')
+        octets = [int(o) for o in parts]
+        prefix = int(prefix)
+        
+        # Same octet rules as ipaddress: four values 0-255, no leading zeros
+        if (len(octets) != 4 or any(o > 255 for o in octets)
+                or any(len(o) > 1 and o[0] == '0' for o in parts)):
+            raise ValidationError(f'Invalid subnet: {value}')
+        
+        # Check for valid subnet ranges
+        if prefix < 8 or prefix > 32:
+            raise ValidationError('Subnet prefix must be between /8 and /32')
+        
+        # Check for reserved networks (host bits are ignored, as with strict=False)
+        addr = (octets[0] << 24) | (octets[1] << 16) | (octets[2] << 8) | octets[3]
+        addr &= (0xFFFFFFFF << (32 - prefix)) & 0xFFFFFFFF
+        for start, end in (_RESERVED_RANGE, _MULTICAST_RANGE):
+            if start <= addr <= end:
                 raise ValidationError('Cannot use reserved or multicast networks')
-        except ValueError as e:
-            raise ValidationError(f'Invalid subnet: {str(e)}')
 
 class AWSFileSchema(Schema):
     """Schema for validating AWS export file structure"""
@@ -100,10 +127,9 @@ class FileUploadSchema(Schema):
             raise ValidationError('Invalid filename')
         
         # Check extension
-        allowed_extensions = {'.csv', '.xlsx', '.xls'}
-        ext = value.lower().rsplit('.', 1)[-1] if '.' in value else ''
-        if f'.{ext}' not in allowed_extensions:
-            raise ValidationError(f'File type not allowed. Allowed types: {", ".join(allowed_extensions)}')
+        _, dot, ext = value.rpartition('.')
+        if not dot or ext.lower() not in _ALLOWED_EXTS:
+            raise ValidationError(f'File type not allowed. Allowed types: {", ".join(sorted(_ALLOWED_EXTS))}')
     
     @validates('size')
     def validate_size(self, value):
@@ -162,7 +188,7 @@ def sanitize_string(value, max_length=None):
         return str(value)
     
     # Remove control characters
-    value = re.sub(r'[\x00-\x1F\x7F]', '', value)
+    value = value.translate(_CTRL_TABLE)
     
     # Trim whitespace
     value = value.strip()
@@ -180,7 +206,7 @@ def validate_aws_tags(tags_dict):
     
     for key, value in tags_dict.items():
         # AWS tag key constraints
-        if not re.match(r'^[\w\s\-\.:/+=@]*$', key):
+        if not _TAG_KEY_RE.match(key):
             raise ValidationError(f'Invalid tag key: {key}')
         if len(key) > 128:
             raise ValidationError(f'Tag key too long: {key}')
@@ -1,7 +1,12 @@
+from functools import lru_cache
 from typing import Dict, List, Tuple
-import difflib
+from rapidfuzz import fuzz, process
 import re
 
+_SEP_RE = re.compile(r'[-\s]+')
+_EMAIL_RE = re.compile(r'^[\w\.-]+@[\w\.-]+\.\w+$')
+_URL_RE = re.compile(r'^https?://[\w\.-]+')
+
 class AttributeMapper:
     """Map AWS tags to InfoBlox extended attributes with similarity detection"""
     
@@ -27,42 +32,58 @@ class AttributeMapper:
             for variant in group:
                 self.variation_map[variant.lower()] = canonical
     
-    def normalize_attribute_name(self, name: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=8192)
+    def normalize_attribute_name(name: str) -> str:
         """Normalize attribute name for comparison"""
         # Convert to lowercase and replace common separators with underscore
         normalized = name.lower()
-        normalized = re.sub(r'[-\s]+', '_', normalized)
+        normalized = _SEP_RE.sub('_', normalized)
         return normalized
     
     def find_similar_attributes(self, aws_tag: str, infoblox_attrs: List[str], 
                                threshold: float = 0.8) -> List[Tuple[str, float]]:
         """Find similar InfoBlox attributes for an AWS tag"""
         aws_normalized = self.normalize_attribute_name(aws_tag)
-        matches = []
+        ib_normalized, ib_by_canonical = self._index_infoblox_attrs(infoblox_attrs)
+        
+        # Score every candidate in one native RapidFuzz call
+        ratios = [0.0] * len(ib_normalized)
+        for _, score, idx in process.extract(aws_normalized, ib_normalized, scorer=fuzz.ratio, limit=None):
+            ratios[idx] = score
         
-        # Check if it's a known variation
-        if aws_normalized in self.variation_map:
-            canonical = self.variation_map[aws_normalized]
-            # Look for the canonical form in InfoBlox attributes
-            for ib_attr in infoblox_attrs:
-                if self.normalize_attribute_name(ib_attr) in self.variation_map:
-                    if self.variation_map[self.normalize_attribute_name(ib_attr)] == canonical:
-                        matches.append((ib_attr, 0.95))  # High confidence for known variations
+        return self._find_similar(aws_normalized, infoblox_attrs, ib_normalized, ib_by_canonical,
+                                  ratios, threshold)
+    
+    def _index_infoblox_attrs(self, infoblox_attrs: List[str]) -> Tuple[List[str], Dict[str, List[str]]]:
+        """Normalize InfoBlox attributes once and group them by known canonical variation"""
+        ib_normalized = [self.normalize_attribute_name(ib_attr) for ib_attr in infoblox_attrs]
+        ib_by_canonical = {}
+        for ib_attr, ib_norm in zip(infoblox_attrs, ib_normalized):
+            canonical = self.variation_map.get(ib_norm)
+            if canonical:
+                ib_by_canonical.setdefault(canonical, []).append(ib_attr)
+        return ib_normalized, ib_by_canonical
+    
+    def _find_similar(self, aws_normalized: str, infoblox_attrs: List[str], ib_normalized: List[str],
+                      ib_by_canonical: Dict[str, List[str]], ratios,
+                      threshold: float) -> List[Tuple[str, float]]:
+        """Rank InfoBlox attributes given precomputed normalized names and 0-100 ratio scores"""
+        # Known variations of the same canonical name get high confidence
+        canonical = self.variation_map.get(aws_normalized)
+        matches = [(ib_attr, 0.95) for ib_attr in ib_by_canonical.get(canonical, ())] if canonical else []
         
         # Use string similarity for other cases
-        for ib_attr in infoblox_attrs:
-            ib_normalized = self.normalize_attribute_name(ib_attr)
-            
-            # Calculate similarity
-            similarity = difflib.SequenceMatcher(None, aws_normalized, ib_normalized).ratio()
+        for ib_attr, ib_norm, ratio in zip(infoblox_attrs, ib_normalized, ratios):
+            similarity = ratio / 100
             
             # Check for substring matches
-            if aws_normalized in ib_normalized or ib_normalized in aws_normalized:
+            if aws_normalized in ib_norm or ib_norm in aws_normalized:
                 similarity = max(similarity, 0.85)
             
             # Check for common prefixes/suffixes
-            if (aws_normalized.startswith(ib_normalized[:3]) or 
-                ib_normalized.startswith(aws_normalized[:3])):
+            if (aws_normalized.startswith(ib_norm[:3]) or 
+                ib_norm.startswith(aws_normalized[:3])):
                 similarity = max(similarity, 0.7)
             
             if similarity >= threshold:
@@ -77,9 +98,19 @@ class AttributeMapper:
         """Create mapping suggestions for AWS tags to InfoBlox attributes"""
         mappings = {}
         
-        for tag in aws_tags:
+        aws_normalized = [self.normalize_attribute_name(tag) for tag in aws_tags]
+        ib_normalized, ib_by_canonical = self._index_infoblox_attrs(infoblox_attrs)
+        
+        # Score the full tag x attribute matrix natively, spread across all cores
+        if aws_normalized and ib_normalized:
+            ratio_matrix = process.cdist(aws_normalized, ib_normalized, scorer=fuzz.ratio, workers=-1).tolist()
+        else:
+            ratio_matrix = [[] for _ in aws_normalized]
+        
+        for tag, tag_normalized, ratios in zip(aws_tags, aws_normalized, ratio_matrix):
             suggestions = []
-            similar = self.find_similar_attributes(tag, infoblox_attrs)
+            similar = self._find_similar(tag_normalized, infoblox_attrs, ib_normalized, ib_by_canonical,
+                                         ratios, 0.8)
             
             for ib_attr, score in similar[:3]:  # Top 3 suggestions
                 suggestions.append({
@@ -111,14 +142,12 @@ class AttributeMapper:
             return True, ""
         
         elif attr_type == "EMAIL":
-            email_pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
-            if re.match(email_pattern, value):
+            if _EMAIL_RE.match(value):
                 return True, ""
             return False, f"Value '{value}' is not a valid email address"
         
         elif attr_type == "URL":
-            url_pattern = r'^https?://[\w\.-]+'
-            if re.match(url_pattern, value):
+            if _URL_RE.match(value):
                 return True, ""
             return False, f"Value '{value}' is not a valid URL"
         
@@ -128,16 +157,15 @@ class AttributeMapper:
     def apply_mappings(self, aws_networks: List[Dict], 
                       attribute_mappings: Dict[str, str]) -> List[Dict]:
         """Apply attribute mappings to AWS networks"""
+        # Drop skipped (unmapped) tags once rather than re-checking them per network
+        active = {aws_tag: ib_attr for aws_tag, ib_attr in attribute_mappings.items() if ib_attr}
+        
         for network in aws_networks:
-            mapped_extattrs = {}
-            
-            for aws_tag, tag_value in network.get('tags', {}).items():
-                if aws_tag in attribute_mappings:
-                    ib_attr = attribute_mappings[aws_tag]
-                    if ib_attr:  # If mapped (not skipped)
-                        # InfoBlox expects extattrs in {'value': actual_value} format
-                        mapped_extattrs[ib_attr] = {'value': str(tag_value)}
-            
-            network['mapped_extattrs'] = mapped_extattrs
+            # InfoBlox expects extattrs in {'value': actual_value} format
+            network['mapped_extattrs'] = {
+                active[aws_tag]: {'value': str(tag_value)}
+                for aws_tag, tag_value in network.get('tags', {}).items()
+                if aws_tag in active
+            }
         
         return aws_networks
\ No newline at end of file
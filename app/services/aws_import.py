@@ -1,19 +1,52 @@
 import pandas as pd
+import pyarrow.csv as pacsv
 from typing import Dict, List, Any, Tuple
-import json
+import ipaddress
 import re
 
+# google-re2 scans in linear time with a DFA; the stdlib engine is the fallback
+try:
+    import re2 as _tag_re
+except ImportError:
+    _tag_re = re
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    import json
+    _loads = json.loads
+
+# "key=value" and "key:value" pairs separated by ',' or ';'
+_EQ_PAIR_RE = _tag_re.compile(r'([^,;=]+)=([^,;]*)')
+_COLON_PAIR_RE = _tag_re.compile(r'([^,;:]+):([^,;]*)')
+
+def network_key(cidr: str) -> str:
+    """Canonical CIDR form so '10.0.0.0/8' and '10.0.0.0/255.0.0.0' compare equal"""
+    try:
+        return ipaddress.ip_network(cidr.strip(), strict=False).with_prefixlen
+    except ValueError:
+        return cidr.strip()
+
 class AWSImporter:
     """Handle AWS network export file import and parsing"""
     
     def __init__(self):
         self.required_columns = ['subnet', 'account', 'region']
         self.tag_column = 'TAG'  # or 'TAGS' depending on the file
+        self._unique_tags: set = set()
+    
+    @property
+    def unique_tags(self) -> set:
+        """Tag keys seen across all rows processed by process_aws_data"""
+        return self._unique_tags
         
     def parse_file(self, filepath: str) -> pd.DataFrame:
         """Parse AWS export file (CSV or Excel)"""
         if filepath.endswith('.csv'):
-            df = pd.read_csv(filepath)
+            # Multi-threaded Arrow reader, converted to pandas once for the column logic below
+            table = pacsv.read_csv(filepath, read_options=pacsv.ReadOptions(use_threads=True))
+            df = table.to_pandas()
         else:
             df = pd.read_excel(filepath)
         
@@ -48,8 +81,6 @@ class AWSImporter:
         if pd.isna(tag_string) or not tag_string:
             return {}
         
-        tags = {}
-        
         # Handle different tag formats
         # Format 1: "key1=value1,key2=value2"
         # Format 2: "key1:value1;key2:value2"
@@ -60,55 +91,102 @@ class AWSImporter:
         # Try JSON format first
         if tag_string.startswith('{'):
             try:
-                return json.loads(tag_string)
-            except:
+                return _loads(tag_string)
+            except (ValueError, TypeError):
                 pass
         
         # Try comma-separated key=value pairs
         if '=' in tag_string:
-            pairs = re.split('[,;]', tag_string)
-            for pair in pairs:
-                if '=' in pair:
-                    key, value = pair.split('=', 1)
-                    tags[key.strip()] = value.strip()
+            pairs = _EQ_PAIR_RE.findall(tag_string)
         
         # Try colon-separated key:value pairs
         elif ':' in tag_string:
-            pairs = re.split('[,;]', tag_string)
-            for pair in pairs:
-                if ':' in pair:
-                    key, value = pair.split(':', 1)
-                    tags[key.strip()] = value.strip()
+            pairs = _COLON_PAIR_RE.findall(tag_string)
+        
+        else:
+            return {}
+        
+        return {key.strip(): value.strip() for key, value in pairs}
+    
+    def parse_tag_column(self, column: pd.Series) -> List[Dict[str, Any]]:
+        """Parse a whole tag column, vectorizing the common key=value format"""
+        column = column.reset_index(drop=True)
+        tags = [{} for _ in range(len(column))]
+        
+        text = column[column.notna()].astype(str).str.strip()
+        text = text[text != '']
+        
+        # Plain key=value rows go through one extractall scan; JSON and key:value rows use parse_tags
+        is_eq = text.str.contains('=', regex=False) & ~text.str.startswith('{')
+        if is_eq.any():
+            pairs = text[is_eq].str.extractall(_EQ_PAIR_RE.pattern).fillna('')
+            for row, key, value in zip(pairs.index.get_level_values(0),
+                                       pairs[0].str.strip(), pairs[1].str.strip()):
+                tags[row][key] = value
+        
+        for row, tag_string in text[~is_eq].items():
+            tags[row] = self.parse_tags(tag_string)
         
         return tags
     
     def process_aws_data(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
         """Process AWS data into a format suitable for InfoBlox import"""
-        networks = []
-        
-        for _, row in df.iterrows():
-            # Get subnet (handle different column name cases)
-            subnet_col = next((col for col in df.columns if col.lower() == 'subnet'), 'subnet')
-            subnet = row.get(subnet_col, '')
-            
-            if not subnet or pd.isna(subnet):
-                continue
-            
-            # Get other fields
-            account_col = next((col for col in df.columns if col.lower() == 'account'), 'account')
-            region_col = next((col for col in df.columns if col.lower() == 'region'), 'region')
-            
-            network_data = {
-                'subnet': str(subnet).strip(),
-                'account': str(row.get(account_col, '')).strip(),
-                'region': str(row.get(region_col, '')).strip(),
-                'tags': self.parse_tags(row.get(self.tag_column, '')),
-                'raw_data': row.to_dict()
+        # Resolve column names once (handle different column name cases)
+        columns = {}
+        for col in df.columns:
+            columns.setdefault(col.lower(), col)
+        subnet_col = columns.get('subnet', 'subnet')
+        account_col = columns.get('account', 'account')
+        region_col = columns.get('region', 'region')
+        
+        if subnet_col not in df.columns:
+            return []
+        
+        # Drop rows without a subnet
+        df = df[df[subnet_col].notna()]
+        subnets = df[subnet_col].astype(str).str.strip()
+        has_subnet = subnets != ''
+        df = df[has_subnet]
+        subnets = subnets[has_subnet].tolist()
+        
+        def column_values(col):
+            if col not in df.columns:
+                return [''] * len(df)
+            return df[col].astype(str).str.strip().tolist()
+        
+        accounts = column_values(account_col)
+        regions = column_values(region_col)
+        
+        if self.tag_column in df.columns:
+            tags = self.parse_tag_column(df[self.tag_column])
+        else:
+            tags = [{} for _ in range(len(df))]
+        self._unique_tags.update(*tags)
+        
+        return [
+            {
+                'subnet': subnet,
+                'account': account,
+                'region': region,
+                'tags': row_tags
             }
-            
-            networks.append(network_data)
+            for subnet, account, region, row_tags in zip(subnets, accounts, regions, tags)
+        ]
+    
+    def load(self, filepath: str) -> Tuple[List[Dict[str, Any]], List[str], List[str]]:
+        """Parse, validate and process an AWS export file in one pass
+        
+        Returns (networks, errors, unique_tags); networks is empty when errors is not.
+        """
+        df = self.parse_file(filepath)
+        
+        is_valid, errors = self.validate_file(df)
+        if not is_valid:
+            return [], errors, []
         
-        return networks
+        networks = self.process_aws_data(df)
+        
+        return networks, [], list(self.unique_tags)
     
     def compare_with_infoblox(self, aws_networks: List[Dict[str, Any]], 
                              infoblox_networks: List[Dict[str, Any]]) -> Dict[str, List]:
@@ -119,23 +197,31 @@ class AWSImporter:
             'conflicts': []     # Networks with conflicting attributes
         }
         
-        # Create a map of InfoBlox networks by subnet
-        ib_map = {net['network']: net for net in infoblox_networks}
+        # Index InfoBlox networks by canonical CIDR once; each AWS network is then a single lookup.
+        # Extattrs are unwrapped from InfoBlox's {'value': actual_value} format while indexing.
+        ib_map = {
+            network_key(net['network']): (
+                net.get('_ref'),
+                net.get('extattrs', {}),
+                {
+                    k: (v['value'] if isinstance(v, dict) and 'value' in v else v)
+                    for k, v in net.get('extattrs', {}).items()
+                }
+            )
+            for net in infoblox_networks
+        }
         
         for aws_net in aws_networks:
-            subnet = aws_net['subnet']
+            ib_entry = ib_map.get(network_key(aws_net['subnet']))
             
-            if subnet in ib_map:
+            if ib_entry is not None:
                 # Network exists in InfoBlox
-                ib_net = ib_map[subnet]
-                aws_net['infoblox_ref'] = ib_net.get('_ref')
-                aws_net['infoblox_extattrs'] = ib_net.get('extattrs', {})
+                ib_ref, ib_extattrs, ib_values = ib_entry
+                aws_net['infoblox_ref'] = ib_ref
+                aws_net['infoblox_extattrs'] = ib_extattrs
                 
                 # Check for conflicts in extended attributes
-                conflicts = self.find_attribute_conflicts(
-                    aws_net['tags'], 
-                    ib_net.get('extattrs', {})
-                )
+                conflicts = self.find_attribute_conflicts(aws_net['tags'], ib_values)
                 
                 if conflicts:
                     aws_net['conflicts'] = conflicts
@@ -149,17 +235,13 @@ class AWSImporter:
         return comparison
     
     def find_attribute_conflicts(self, aws_tags: Dict[str, str], 
-                                ib_extattrs: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Find conflicts between AWS tags and InfoBlox extended attributes"""
+                                ib_values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Find conflicts between AWS tags and unwrapped InfoBlox extended attribute values"""
         conflicts = []
         
         for tag_key, tag_value in aws_tags.items():
-            if tag_key in ib_extattrs:
-                ib_value = ib_extattrs[tag_key]
-                # InfoBlox extattrs might have value in {'value': actual_value} format
-                if isinstance(ib_value, dict) and 'value' in ib_value:
-                    ib_value = ib_value['value']
-                
+            if tag_key in ib_values:
+                ib_value = ib_values[tag_key]
                 if str(tag_value) != str(ib_value):
                     conflicts.append({
                         'attribute': tag_key,
@@ -0,0 +1,45 @@
+"""Redis cache encoding shared by the web app and Celery workers"""
+import hashlib
+import orjson
+import xxhash
+import zstandard as zstd
+from cachetools import LRUCache
+from typing import Any
+
+# Cached payloads are zstd-compressed and tagged so legacy raw JSON entries still decode
+_ZSTD_TAG = b'z\x00'
+_zc = zstd.ZstdCompressor(level=3)
+_zd = zstd.ZstdDecompressor()
+
+# Decoded payloads by content hash; the same blob is read many times between refreshes.
+# Bounded by decoded JSON size (a rough proxy for the objects' footprint), not entry count
+_DECODED_MAX_BYTES = 32 << 20
+_DECODED_MAX_ENTRY = 1 << 20
+_decoded = LRUCache(maxsize=_DECODED_MAX_BYTES, getsizeof=lambda entry: entry[0])
+
+def cache_key(prefix: str, *args) -> str:
+    """Generate cache key"""
+    return xxhash.xxh3_64_hexdigest(f"{prefix}:{':'.join(map(str, args))}")
+
+def pack_cache(obj: Any) -> bytes:
+    """Serialize and compress a value for the Redis cache"""
+    return _ZSTD_TAG + _zc.compress(orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS))
+
+def unpack_cache(raw: bytes) -> Any:
+    """Decode a cached value written by pack_cache (or a legacy raw JSON entry)
+
+    Results up to 1 MiB of JSON are memoized per process by content hash, so callers
+    must not mutate them.
+    """
+    digest = hashlib.blake2b(raw, digest_size=16).digest()
+
+    entry = _decoded.get(digest)
+    if entry is not None:
+        return entry[1]
+
+    blob = _zd.decompress(raw[len(_ZSTD_TAG):]) if raw.startswith(_ZSTD_TAG) else raw
+    value = orjson.loads(blob)
+    # Large payloads (full network lists) would crowd out everything else; decode them each time
+    if len(blob) <= _DECODED_MAX_ENTRY:
+        _decoded[digest] = (len(blob), value)
+    return value
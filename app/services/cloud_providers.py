@@ -1,37 +1,89 @@
-import boto3
+import asyncio
+import contextlib
+import aioboto3
 from azure.identity import DefaultAzureCredential
 from azure.mgmt.network import NetworkManagementClient
 from google.cloud import compute_v1
 import requests
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-class AWSProvider:
-    def __init__(self):
-        self.ec2_client = boto3.client('ec2')
-        self.route53_client = boto3.client('route53')
+# SDK clients load service models on construction; they are thread-safe, so build each once per process
+_CLIENT_CACHE = {}
+_CLIENT_LOCK = threading.Lock()
+
+def _cached_client(key, factory):
+    """Return the process-wide client for key, constructing it with factory on first use"""
+    client = _CLIENT_CACHE.get(key)
+    if client is None:
+        with _CLIENT_LOCK:
+            client = _CLIENT_CACHE.get(key)
+            if client is None:
+                client = _CLIENT_CACHE[key] = factory()
+    return client
+
+# aioboto3 clients stay open for the life of the process; close_aws_clients() releases them
+_AIO_SESSION = aioboto3.Session()
+_AIO_CLIENTS = {}
+_AIO_STACK = contextlib.AsyncExitStack()
+
+async def _aio_client(service):
+    """Return the process-wide open aioboto3 client for service, opening it on first use"""
+    client = _AIO_CLIENTS.get(service)
+    if client is None:
+        client = await _AIO_STACK.enter_async_context(_AIO_SESSION.client(service))
+        # Another coroutine may have opened one while this one awaited; keep the first
+        client = _AIO_CLIENTS.setdefault(service, client)
+    return client
+
+async def close_aws_clients():
+    """Close the shared aioboto3 clients (call on app shutdown)"""
+    _AIO_CLIENTS.clear()
+    await _AIO_STACK.aclose()
+
+class AWSProviderAsync:
+    """AWS provider built on aioboto3 so SDK calls run on the event loop"""
     
-    def get_ddi_data(self):
+    async def _paginate(self, client, operation, key):
+        items = []
+        async for page in client.get_paginator(operation).paginate():
+            items.extend(page.get(key, []))
+        return items
+    
+    async def get_ddi_data(self):
         try:
-            vpcs = self.ec2_client.describe_vpcs()
-            subnets = self.ec2_client.describe_subnets()
-            hosted_zones = self.route53_client.list_hosted_zones()
+            ec2_client = await _aio_client('ec2')
+            route53_client = await _aio_client('route53')
+            vpcs, subnets, hosted_zones = await asyncio.gather(
+                self._paginate(ec2_client, 'describe_vpcs', 'Vpcs'),
+                self._paginate(ec2_client, 'describe_subnets', 'Subnets'),
+                self._paginate(route53_client, 'list_hosted_zones', 'HostedZones')
+            )
             
             return {
-                'vpcs': vpcs.get('Vpcs', []),
-                'subnets': subnets.get('Subnets', []),
-                'dns_zones': hosted_zones.get('HostedZones', [])
+                'vpcs': vpcs,
+                'subnets': subnets,
+                'dns_zones': hosted_zones
             }
         except Exception as e:
             return {'error': str(e)}
 
 class AzureProvider:
     def __init__(self):
-        self.credential = DefaultAzureCredential()
         self.subscription_id = os.environ.get('AZURE_SUBSCRIPTION_ID')
-        self.network_client = NetworkManagementClient(
-            self.credential, 
-            self.subscription_id
-        ) if self.subscription_id else None
+    
+    @property
+    def network_client(self):
+        if not self.subscription_id:
+            return None
+        return _cached_client(
+            ('azure-network', self.subscription_id),
+            lambda: NetworkManagementClient(
+                _cached_client(('azure-credential',), DefaultAzureCredential),
+                self.subscription_id
+            )
+        )
     
     def get_ddi_data(self):
         if not self.network_client:
@@ -61,8 +113,14 @@ class AzureProvider:
 class GCPProvider:
     def __init__(self):
         self.project_id = os.environ.get('GCP_PROJECT_ID')
-        self.networks_client = compute_v1.NetworksClient() if self.project_id else None
-        self.subnetworks_client = compute_v1.SubnetworksClient() if self.project_id else None
+    
+    @property
+    def networks_client(self):
+        return _cached_client(('gcp-networks',), compute_v1.NetworksClient) if self.project_id else None
+    
+    @property
+    def subnetworks_client(self):
+        return _cached_client(('gcp-subnetworks',), compute_v1.SubnetworksClient) if self.project_id else None
     
     def get_ddi_data(self):
         if not self.project_id:
@@ -70,14 +128,18 @@ class GCPProvider:
         
         try:
             networks = list(self.networks_client.list(project=self.project_id))
-            subnets = []
             
-            for zone in compute_v1.ZonesClient().list(project=self.project_id):
-                zone_subnets = list(self.subnetworks_client.list(
-                    project=self.project_id,
-                    region=zone.region.split('/')[-1]
-                ))
-                subnets.extend(zone_subnets)
+            # Zones share regions, so list each region's subnetworks once, all regions concurrently
+            regions = {
+                zone.region.split('/')[-1]
+                for zone in _cached_client(('gcp-zones',), compute_v1.ZonesClient).list(project=self.project_id)
+            }
+            with ThreadPoolExecutor(max_workers=16) as pool:
+                region_subnets = pool.map(
+                    lambda region: list(self.subnetworks_client.list(project=self.project_id, region=region)),
+                    regions
+                )
+                subnets = [subnet for batch in region_subnets for subnet in batch]
             
             return {
                 'networks': [{'name': n.name, 'cidr': n.I_pv4_range} for n in networks],
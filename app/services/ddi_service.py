@@ -2,6 +2,14 @@ import requests
 import json
 from typing import Dict, List, Any
 
+def _subnet_key(subnet: Any) -> Any:
+    """Hashable form of a subnet entry; equal entries map to equal keys"""
+    if isinstance(subnet, dict):
+        return tuple(sorted((k, _subnet_key(v)) for k, v in subnet.items()))
+    if isinstance(subnet, (list, tuple)):
+        return tuple(_subnet_key(v) for v in subnet)
+    return subnet
+
 class DDIService:
     def __init__(self):
         self.infoblox_url = None
@@ -54,15 +62,17 @@ class DDIService:
             'csv': csv_data
         }
         
+        # Index InfoBlox subnets once so each lookup is a hash probe, not a list scan
+        infoblox_keys = frozenset(_subnet_key(s) for s in infoblox_data.get('subnets', []))
+        
         # Check for conflicts and missing entries
         for source_name, source_data in all_sources.items():
             if source_data and source_name != 'infoblox':
                 # Compare subnets
                 source_subnets = source_data.get('subnets', [])
-                infoblox_subnets = infoblox_data.get('subnets', [])
                 
                 for subnet in source_subnets:
-                    if subnet not in infoblox_subnets:
+                    if _subnet_key(subnet) not in infoblox_keys:
                         comparison_result['missing_in_infoblox'].append({
                             'source': source_name,
                             'type': 'subnet',
@@ -1,12 +1,44 @@
 import requests
+import ssl
+import threading
 import urllib3
 from typing import Dict, List, Any, Optional
 import json
 from requests.auth import HTTPBasicAuth
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from cachetools import TTLCache
 
 # Disable SSL warnings for development
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Keep-alive sessions shared by every client for the same grid and credentials, so repeated
+# Celery task runs reuse pooled TLS connections instead of handshaking again
+_SESSION_CACHE: Dict[tuple, requests.Session] = {}
+
+# One SSL context for every pooled connection, whichever session opens it
+_SHARED_SSL = ssl.create_default_context()
+_SHARED_SSL.check_hostname = False
+_SHARED_SSL.verify_mode = ssl.CERT_NONE
+
+# Return field lists shared by the getters
+_VIEW_FIELDS = 'name,comment'
+_NET_FIELDS = 'network,comment,extattrs'
+# Same fields as InfobloxWAPIAsync: both clients fill the shared extensible_attributes cache entry
+_EA_FIELDS = 'name,type,comment'
+
+# Successful read results, keyed by grid, user and query; guarded by _CACHE_LOCK
+_METADATA_CACHE = TTLCache(maxsize=64, ttl=300)
+_SEARCH_CACHE = TTLCache(maxsize=1024, ttl=60)
+_CACHE_LOCK = threading.Lock()
+
+class _SharedSSLAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools all reuse _SHARED_SSL"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['ssl_context'] = _SHARED_SSL
+        return super().init_poolmanager(*args, **kwargs)
+
 class InfobloxWAPI:
     """InfoBlox WAPI v2.13.1 Client"""
     
@@ -16,10 +48,44 @@ class InfobloxWAPI:
         self.password = password
         self.wapi_version = wapi_version
         self.base_url = f"{self.host}/wapi/{wapi_version}"
-        self.session = requests.Session()
-        self.session.auth = HTTPBasicAuth(username, password)
-        self.session.verify = False  # For development, in production use proper SSL
+        key = (self.host, username, password)
+        self.session = _SESSION_CACHE.get(key) or _SESSION_CACHE.setdefault(
+            key, self._build_session(username, password)
+        )
+    
+    @staticmethod
+    def _build_session(username: str, password: str) -> requests.Session:
+        """Create a pooled session that retries transient gateway errors"""
+        session = requests.Session()
+        session.auth = HTTPBasicAuth(username, password)
+        session.verify = False  # For development, in production use proper SSL
+        adapter = _SharedSSLAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+        
+    def _cached_get(self, cache: TTLCache, key: tuple, endpoint: str,
+                    params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """GET a list endpoint, serving repeat queries from cache; failures are not cached"""
+        key = (self.base_url, self.username) + key
+        with _CACHE_LOCK:
+            cached = cache.get(key)
+        if cached is not None:
+            return cached
+        
+        response = self.session.get(f"{self.base_url}/{endpoint}", params=params)
+        if response.status_code != 200:
+            return []
         
+        result = response.json()
+        with _CACHE_LOCK:
+            cache[key] = result
+        return result
+    
     def test_connection(self) -> bool:
         """Test connection to InfoBlox"""
         try:
@@ -31,13 +97,9 @@ class InfobloxWAPI:
     def get_network_views(self) -> List[Dict[str, Any]]:
         """Get all network views"""
         try:
-            response = self.session.get(
-                f"{self.base_url}/networkview",
-                params={'_return_fields': 'name,comment'}
+            return self._cached_get(
+                _METADATA_CACHE, ('networkview',), 'networkview', {'_return_fields': _VIEW_FIELDS}
             )
-            if response.status_code == 200:
-                return response.json()
-            return []
         except Exception as e:
             print(f"Error getting network views: {e}")
             return []
@@ -49,7 +111,7 @@ class InfobloxWAPI:
                 f"{self.base_url}/network",
                 params={
                     'network_view': network_view,
-                    '_return_fields': 'network,comment,extattrs',
+                    '_return_fields': _NET_FIELDS,
                     '_max_results': 10000
                 }
             )
@@ -63,13 +125,10 @@ class InfobloxWAPI:
     def get_extensible_attributes(self) -> List[Dict[str, Any]]:
         """Get all extensible attribute definitions"""
         try:
-            response = self.session.get(
-                f"{self.base_url}/extensibleattributedef",
-                params={'_return_fields': 'name,type,flags,comment,user_type'}
+            return self._cached_get(
+                _METADATA_CACHE, ('extensibleattributedef',), 'extensibleattributedef',
+                {'_return_fields': _EA_FIELDS}
             )
-            if response.status_code == 200:
-                return response.json()
-            return []
         except Exception as e:
             print(f"Error getting extensible attributes: {e}")
             return []
@@ -86,7 +145,11 @@ class InfobloxWAPI:
                 f"{self.base_url}/extensibleattributedef",
                 json=data
             )
-            return response.status_code == 201
+            if response.status_code != 201:
+                return False
+            with _CACHE_LOCK:
+                _METADATA_CACHE.pop((self.base_url, self.username, 'extensibleattributedef'), None)
+            return True
         except Exception as e:
             print(f"Error creating extensible attribute: {e}")
             return False
@@ -99,7 +162,7 @@ class InfobloxWAPI:
                 params={
                     'network': subnet,
                     'network_view': network_view,
-                    '_return_fields': 'network,comment,extattrs'
+                    '_return_fields': _NET_FIELDS
                 }
             )
             if response.status_code == 200:
@@ -149,21 +212,100 @@ class InfobloxWAPI:
             print(f"Error updating network: {e}")
             return False
     
+    def bulk_upsert(self, networks: List[Dict[str, Any]], network_view: str = "default",
+                    existing: Optional[Dict[str, Optional[Dict[str, Any]]]] = None) -> Dict[str, Any]:
+        """Create or update networks using two WAPI multi-object requests
+        
+        Each network needs 'subnet' and may carry 'comment' and 'extattrs'. Falls back to
+        one network at a time if either multi-object request fails. Passing existing (subnet ->
+        InfoBlox record or None) skips the lookup request.
+        """
+        results = {
+            'created': 0,
+            'updated': 0,
+            'failed': 0,
+            'errors': []
+        }
+        if not networks:
+            return results
+        
+        try:
+            if existing is None:
+                response = self.session.post(
+                    f"{self.base_url}/request",
+                    json=[
+                        {
+                            "method": "GET",
+                            "object": "network",
+                            "data": {"network": network['subnet'], "network_view": network_view}
+                        }
+                        for network in networks
+                    ]
+                )
+                response.raise_for_status()
+                records = [found[0] if found else None for found in response.json()]
+            else:
+                records = [existing.get(network['subnet']) for network in networks]
+            
+            writes = []
+            outcomes = []
+            for network, record in zip(networks, records):
+                if record:
+                    writes.append({
+                        "method": "PUT",
+                        "object": record['_ref'],
+                        "data": {"extattrs": network.get('extattrs', {})}
+                    })
+                    outcomes.append('updated')
+                else:
+                    data = {
+                        "network": network['subnet'],
+                        "network_view": network_view,
+                        "comment": network.get('comment', '')
+                    }
+                    if network.get('extattrs'):
+                        data["extattrs"] = network['extattrs']
+                    writes.append({"method": "POST", "object": "network", "data": data})
+                    outcomes.append('created')
+            
+            response = self.session.post(f"{self.base_url}/request", json=writes)
+            response.raise_for_status()
+            for outcome in outcomes:
+                results[outcome] += 1
+            return results
+        except Exception as e:
+            print(f"Bulk upsert failed, retrying networks individually: {e}")
+        
+        for network in networks:
+            subnet = network['subnet']
+            existing = self.get_network_by_subnet(subnet, network_view)
+            if existing:
+                if self.update_network(existing['_ref'], extattrs=network.get('extattrs', {})):
+                    results['updated'] += 1
+                    continue
+                results['errors'].append(f"Failed to update {subnet}")
+            else:
+                if self.create_network(subnet, network_view, network.get('comment', ''),
+                                       network.get('extattrs', {})):
+                    results['created'] += 1
+                    continue
+                results['errors'].append(f"Failed to create {subnet}")
+            results['failed'] += 1
+        
+        return results
+    
     def search_networks_by_extattr(self, attr_name: str, attr_value: str, 
                                   network_view: str = "default") -> List[Dict[str, Any]]:
         """Search networks by extensible attribute"""
         try:
-            response = self.session.get(
-                f"{self.base_url}/network",
-                params={
+            return self._cached_get(
+                _SEARCH_CACHE, (attr_name, attr_value, network_view), 'network',
+                {
                     f'*{attr_name}': attr_value,
                     'network_view': network_view,
-                    '_return_fields': 'network,comment,extattrs'
+                    '_return_fields': _NET_FIELDS
                 }
             )
-            if response.status_code == 200:
-                return response.json()
-            return []
         except Exception as e:
             print(f"Error searching networks: {e}")
             return []
\ No newline at end of file
@@ -1,33 +1,75 @@
 """Async InfoBlox WAPI Client using aiohttp"""
 import aiohttp
 import asyncio
-from typing import Dict, List, Optional, Any
-import json
-from urllib.parse import urljoin
+from typing import AsyncIterator, Dict, List, Optional, Any
+import orjson
 import ssl
-from asyncio_throttle import Throttler
+
+# Return fields for network reads
+_NET_FIELDS = 'network,comment,extattrs'
+
+# Same fields as InfobloxWAPI: both clients fill the shared extensible_attributes cache entry
+_EA_FIELDS = 'name,type,comment'
+
+# Concurrent requests per batch operation
+BATCH_CONCURRENCY = 20
+
+# One SSL context for every client (keeping verify=False for now as per requirements)
+_SHARED_SSL = ssl.create_default_context()
+_SHARED_SSL.check_hostname = False
+_SHARED_SSL.verify_mode = ssl.CERT_NONE
+
+class TokenBucket:
+    """Token-bucket rate limiter; callers only wait when the bucket is empty"""
+    
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._last = None
+    
+    def _refill(self, now: float):
+        if self._last is not None:
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+    
+    async def acquire(self):
+        """Take one token, sleeping until it is available"""
+        self._refill(asyncio.get_running_loop().time())
+        # Reserve the token up front so concurrent waiters queue behind each other
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+    
+    def defer(self, seconds: float):
+        """Hold back new requests for at least the given number of seconds"""
+        self._refill(asyncio.get_running_loop().time())
+        self._tokens = min(self._tokens, -seconds * self.rate)
 
 class InfobloxWAPIAsync:
     """Async InfoBlox Web API Client with connection pooling and rate limiting"""
     
-    def __init__(self, host: str, username: str, password: str, version: str = "2.13.1"):
+    def __init__(self, host: str, username: str, password: str, version: str = "2.13.1",
+                 conn_limit: int = 0, conn_limit_per_host: int = 64, rate: float = 50):
         self.host = host.rstrip('/')
         self.username = username
         self.password = password
         self.version = version
         self.base_url = f"{self.host}/wapi/v{version}/"
         
-        # Connection pool configuration
+        # Connection pool configuration (0 = unlimited; the rate limiter is the real safeguard)
+        self.conn_limit = conn_limit
+        self.conn_limit_per_host = conn_limit_per_host
         self.connector = None
         self.session = None
         
-        # Rate limiting (10 requests per second)
-        self.throttler = Throttler(rate_limit=10, period=1)
+        # Rate limiting (requests per second)
+        self.rate_limiter = TokenBucket(rate=rate)
+        
+        # SSL context shared across instances
+        self.ssl_context = _SHARED_SSL
         
-        # SSL context (keeping verify=False for now as per requirements)
-        self.ssl_context = ssl.create_default_context()
-        self.ssl_context.check_hostname = False
-        self.ssl_context.verify_mode = ssl.CERT_NONE
+        self._auth = aiohttp.BasicAuth(username, password)
     
     async def __aenter__(self):
         """Async context manager entry"""
@@ -42,18 +84,22 @@ class InfobloxWAPIAsync:
         """Initialize connection pool"""
         if not self.connector:
             self.connector = aiohttp.TCPConnector(
-                limit=100,  # Total connection pool size
-                limit_per_host=30,  # Per-host connection limit
+                limit=self.conn_limit,  # Total connection pool size
+                limit_per_host=self.conn_limit_per_host,  # Per-host connection limit
                 ttl_dns_cache=300,  # DNS cache timeout
-                enable_cleanup_closed=True
+                keepalive_timeout=75,
+                enable_cleanup_closed=True,
+                ssl=self.ssl_context  # One shared context for every pooled connection
             )
         
         if not self.session:
             timeout = aiohttp.ClientTimeout(total=30, connect=10)
             self.session = aiohttp.ClientSession(
                 connector=self.connector,
-                auth=aiohttp.BasicAuth(self.username, self.password),
+                auth=self._auth,
                 timeout=timeout,
+                # aiohttp expects a str-returning serializer for json= bodies
+                json_serialize=lambda obj: orjson.dumps(obj).decode(),
                 headers={
                     'Content-Type': 'application/json',
                     'Accept': 'application/json'
@@ -72,39 +118,47 @@ class InfobloxWAPIAsync:
         if not self.session:
             await self.connect()
         
-        url = urljoin(self.base_url, endpoint)
+        url = f"{self.base_url}{endpoint}"
         
-        # Apply rate limiting
-        async with self.throttler:
-            max_retries = 3
-            retry_delay = 1
-            
-            for attempt in range(max_retries):
-                try:
-                    async with self.session.request(
-                        method, 
-                        url, 
-                        ssl=self.ssl_context,
-                        **kwargs
-                    ) as response:
-                        if response.status == 200:
-                            return await response.json()
-                        elif response.status == 201:
-                            return {'_ref': response.headers.get('Location', '')}
-                        elif response.status == 401:
-                            raise Exception("Authentication failed")
-                        else:
-                            error_text = await response.text()
-                            if attempt < max_retries - 1:
-                                await asyncio.sleep(retry_delay * (attempt + 1))
-                                continue
-                            raise Exception(f"Request failed: {response.status} - {error_text}")
-                            
-                except aiohttp.ClientError as e:
-                    if attempt < max_retries - 1:
-                        await asyncio.sleep(retry_delay * (attempt + 1))
-                        continue
-                    raise Exception(f"Connection error: {str(e)}")
+        max_retries = 3
+        retry_delay = 1
+        
+        for attempt in range(max_retries):
+            # Apply rate limiting
+            await self.rate_limiter.acquire()
+            try:
+                async with self.session.request(method, url, **kwargs) as response:
+                    self._apply_rate_headers(response)
+                    if response.status == 200:
+                        return orjson.loads(await response.read())
+                    elif response.status == 201:
+                        return {'_ref': response.headers.get('Location', '')}
+                    elif response.status == 401:
+                        raise Exception("Authentication failed")
+                    else:
+                        error_text = await response.text()
+                        if attempt < max_retries - 1:
+                            await asyncio.sleep(retry_delay * (attempt + 1))
+                            continue
+                        raise Exception(f"Request failed: {response.status} - {error_text}")
+                        
+            except aiohttp.ClientError as e:
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(retry_delay * (attempt + 1))
+                    continue
+                raise Exception(f"Connection error: {str(e)}")
+    
+    def _apply_rate_headers(self, response: aiohttp.ClientResponse):
+        """Back off when the grid signals it is out of request budget"""
+        retry_after = response.headers.get('Retry-After')
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        if retry_after is None and remaining != '0':
+            return
+        try:
+            delay = float(retry_after) if retry_after is not None else 1.0
+        except ValueError:
+            delay = 1.0
+        self.rate_limiter.defer(delay)
     
     async def test_connection(self) -> bool:
         """Test connection to InfoBlox"""
@@ -135,7 +189,7 @@ class InfobloxWAPIAsync:
                 'network',
                 params={
                     'network_view': network_view,
-                    '_return_fields': 'network,comment,extattrs',
+                    '_return_fields': _NET_FIELDS,
                     '_max_results': 10000
                 }
             )
@@ -144,16 +198,18 @@ class InfobloxWAPIAsync:
             print(f"Error getting networks: {e}")
             return []
     
-    async def get_networks_batch(self, network_view: str = "default", batch_size: int = 1000) -> List[Dict]:
-        """Get networks in batches for large datasets"""
-        all_networks = []
+    async def iter_networks(self, network_view: str = "default",
+                            batch_size: int = 1000) -> AsyncIterator[Dict]:
+        """Yield networks page by page using WAPI paging"""
         paging_id = None
         
         while True:
             params = {
                 'network_view': network_view,
-                '_return_fields': 'network,comment,extattrs',
-                '_max_results': batch_size
+                '_return_fields': _NET_FIELDS,
+                '_max_results': batch_size,
+                '_paging': 1,
+                '_return_as_object': 1
             }
             
             if paging_id:
@@ -161,21 +217,34 @@ class InfobloxWAPIAsync:
             
             try:
                 response = await self._make_request('GET', 'network', params=params)
-                
-                if isinstance(response, dict) and 'next_page_id' in response:
-                    all_networks.extend(response.get('result', []))
-                    paging_id = response.get('next_page_id')
-                    if not paging_id:
-                        break
-                else:
-                    all_networks.extend(response if isinstance(response, list) else [])
-                    break
-                    
             except Exception as e:
                 print(f"Error in batch retrieval: {e}")
-                break
+                return
+            
+            for network in response.get('result', []):
+                yield network
+            
+            paging_id = response.get('next_page_id')
+            if not paging_id:
+                return
+    
+    async def index_networks(self, network_view: str = "default",
+                             max_networks: Optional[int] = None) -> Optional[Dict[str, Dict]]:
+        """Fetch the view's networks keyed by their 'network' field in one paged scan
         
-        return all_networks
+        Gives up and returns None once the view holds more than max_networks networks, for
+        callers that only want the scan while it is cheaper than looking subnets up directly.
+        """
+        index = {}
+        async for network in self.iter_networks(network_view):
+            if max_networks is not None and len(index) >= max_networks:
+                return None
+            index[network['network']] = network
+        return index
+    
+    async def get_networks_batch(self, network_view: str = "default", batch_size: int = 1000) -> List[Dict]:
+        """Get networks in batches for large datasets"""
+        return [network async for network in self.iter_networks(network_view, batch_size)]
     
     async def get_network_by_subnet(self, subnet: str, network_view: str = "default") -> Optional[Dict]:
         """Get network by subnet"""
@@ -186,7 +255,7 @@ class InfobloxWAPIAsync:
                 params={
                     'network': subnet,
                     'network_view': network_view,
-                    '_return_fields': 'network,comment,extattrs'
+                    '_return_fields': _NET_FIELDS
                 }
             )
             return response[0] if response else None
@@ -220,51 +289,122 @@ class InfobloxWAPIAsync:
             if extattrs is not None:
                 data['extattrs'] = extattrs
             
-            ref = ref.split('/')[-1] if '/' in ref else ref
-            await self._make_request('PUT', f'network/{ref}', json=data)
+            # WAPI refs already carry the object type ("network/<id>:<cidr>/<view>")
+            await self._make_request('PUT', ref, json=data)
             return True
         except Exception as e:
             print(f"Error updating network: {e}")
             return False
     
-    async def create_networks_batch(self, networks: List[Dict], network_view: str = "default") -> Dict:
-        """Create multiple networks in parallel"""
+    async def bulk_upsert(self, networks: List[Dict], network_view: str = "default",
+                          existing: Optional[Dict[str, Optional[Dict]]] = None) -> Dict:
+        """Create or update networks using two WAPI multi-object requests
+        
+        Each network needs 'subnet' and may carry 'comment' and 'extattrs'. One /request looks
+        all subnets up and a second applies every POST/PUT; if either fails the networks are
+        upserted one at a time so per-network errors are still reported. Passing existing (subnet ->
+        InfoBlox record or None, e.g. from a prefetch) skips the lookup request.
+        """
         results = {
             'created': 0,
+            'updated': 0,
             'failed': 0,
             'errors': []
         }
+        if not networks:
+            return results
         
-        # Create tasks for parallel execution
-        tasks = []
-        for network in networks:
-            task = self.create_network(
-                network['subnet'],
-                network_view,
-                network.get('comment', ''),
-                network.get('extattrs', {})
-            )
-            tasks.append(task)
-        
-        # Execute in batches to avoid overwhelming the server
-        batch_size = 10
-        for i in range(0, len(tasks), batch_size):
-            batch = tasks[i:i + batch_size]
-            batch_results = await asyncio.gather(*batch, return_exceptions=True)
+        try:
+            if existing is None:
+                lookups = await self._make_request('POST', 'request', json=[
+                    {
+                        'method': 'GET',
+                        'object': 'network',
+                        'data': {'network': network['subnet'], 'network_view': network_view}
+                    }
+                    for network in networks
+                ])
+                records = [found[0] if found else None for found in lookups]
+            else:
+                records = [existing.get(network['subnet']) for network in networks]
             
-            for j, result in enumerate(batch_results):
-                if isinstance(result, Exception):
-                    results['failed'] += 1
-                    results['errors'].append(str(result))
-                elif result:
-                    results['created'] += 1
+            writes = []
+            outcomes = []
+            for network, record in zip(networks, records):
+                if record:
+                    writes.append({
+                        'method': 'PUT',
+                        'object': record['_ref'],
+                        'data': {'extattrs': network.get('extattrs', {})}
+                    })
+                    outcomes.append('updated')
                 else:
-                    results['failed'] += 1
-                    results['errors'].append(f"Failed to create network {networks[i+j]['subnet']}")
+                    data = {
+                        'network': network['subnet'],
+                        'network_view': network_view,
+                        'comment': network.get('comment', '')
+                    }
+                    if network.get('extattrs'):
+                        data['extattrs'] = network['extattrs']
+                    writes.append({'method': 'POST', 'object': 'network', 'data': data})
+                    outcomes.append('created')
             
-            # Small delay between batches
-            if i + batch_size < len(tasks):
-                await asyncio.sleep(0.5)
+            await self._make_request('POST', 'request', json=writes)
+            for outcome in outcomes:
+                results[outcome] += 1
+            return results
+        except Exception as e:
+            print(f"Bulk upsert failed, retrying networks individually: {e}")
+        
+        for network in networks:
+            subnet = network['subnet']
+            existing = await self.get_network_by_subnet(subnet, network_view)
+            if existing:
+                if await self.update_network(existing['_ref'], extattrs=network.get('extattrs', {})):
+                    results['updated'] += 1
+                    continue
+                results['errors'].append(f"Failed to update {subnet}")
+            else:
+                if await self.create_network(subnet, network_view, network.get('comment', ''),
+                                             network.get('extattrs', {})):
+                    results['created'] += 1
+                    continue
+                results['errors'].append(f"Failed to create {subnet}")
+            results['failed'] += 1
+        
+        return results
+    
+    async def create_networks_batch(self, networks: List[Dict], network_view: str = "default") -> Dict:
+        """Create multiple networks in parallel"""
+        results = {
+            'created': 0,
+            'failed': 0,
+            'errors': []
+        }
+        
+        # Bound in-flight creates; the rate limiter paces them against the grid
+        sem = asyncio.Semaphore(BATCH_CONCURRENCY)
+        
+        async def guarded(network):
+            async with sem:
+                return await self.create_network(
+                    network['subnet'],
+                    network_view,
+                    network.get('comment', ''),
+                    network.get('extattrs', {})
+                )
+        
+        batch_results = await asyncio.gather(*[guarded(n) for n in networks], return_exceptions=True)
+        
+        for network, result in zip(networks, batch_results):
+            if isinstance(result, Exception):
+                results['failed'] += 1
+                results['errors'].append(str(result))
+            elif result:
+                results['created'] += 1
+            else:
+                results['failed'] += 1
+                results['errors'].append(f"Failed to create network {network['subnet']}")
         
         return results
     
@@ -274,7 +414,7 @@ class InfobloxWAPIAsync:
             response = await self._make_request(
                 'GET',
                 'extensibleattributedef',
-                params={'_return_fields': 'name,type,comment'}
+                params={'_return_fields': _EA_FIELDS}
             )
             return response if isinstance(response, list) else []
         except Exception as e:
@@ -297,20 +437,22 @@ class InfobloxWAPIAsync:
             return False
     
     async def search_networks_by_attribute(self, attr_name: str, attr_value: str, 
-                                         network_view: str = "default") -> List[Dict]:
-        """Search networks by extensible attribute value"""
+                                         network_view: str = "default",
+                                         exists_only: bool = False) -> List[Dict]:
+        """Search networks by extensible attribute value
+        
+        With exists_only, at most one match is fetched; use it when only presence matters.
+        """
         try:
-            search_filter = {f"*{attr_name}": attr_value}
-            response = await self._make_request(
-                'GET',
-                'network',
-                params={
-                    'network_view': network_view,
-                    '_return_fields': 'network,comment,extattrs',
-                    **{f"*{attr_name}": attr_value}
-                }
-            )
+            params = {
+                'network_view': network_view,
+                '_return_fields': _NET_FIELDS,
+                f"*{attr_name}": attr_value
+            }
+            if exists_only:
+                params['_max_results'] = 1
+            response = await self._make_request('GET', 'network', params=params)
             return response if isinstance(response, list) else []
         except Exception as e:
             print(f"Error searching networks: {e}")
-            return []
\ No newline at end of file
+            return []
@@ -2,16 +2,33 @@
 from celery import Task
 from app import celery
 from app.services.infoblox_wapi import InfobloxWAPI
+from app.services.infoblox_wapi_async import InfobloxWAPIAsync
 from app.services.aws_import import AWSImporter
 from app.services.attribute_mapper import AttributeMapper
 from app.services.ddi_service import DDIService
-import json
+from app.services.cache import cache_key, pack_cache
+import asyncio
+import logging
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 import redis
 import time
 
+logger = logging.getLogger(__name__)
+
 # Redis client for task status updates
 redis_client = redis.Redis(host='localhost', port=6379, db=0, decode_responses=True)
 
+# Networks per WAPI multi-object request, and chunks in flight per import task
+BULK_CHUNK_SIZE = 100
+IMPORT_CONCURRENCY = 4
+
+# Minimum seconds between progress writes to the result backend
+PROGRESS_INTERVAL = 0.1
+
+# Error messages kept in an import result; the rest go to a Redis list for the task
+MAX_REPORTED_ERRORS = 50
+
 class CallbackTask(Task):
     """Task with progress callback support"""
     def on_success(self, retval, task_id, args, kwargs):
@@ -22,6 +39,20 @@ class CallbackTask(Task):
         """Failure callback"""
         pass
 
+def record_errors(results, errors, task_id):
+    """Add errors to a result, keeping at most MAX_REPORTED_ERRORS and spilling the rest to Redis"""
+    results['error_count'] = results.get('error_count', 0) + len(errors)
+    room = max(MAX_REPORTED_ERRORS - len(results['errors']), 0)
+    results['errors'].extend(errors[:room])
+    
+    overflow = errors[room:]
+    if overflow and task_id:
+        key = f"task_errors:{task_id}"
+        with redis_client.pipeline(transaction=False) as pipe:
+            pipe.rpush(key, *overflow)
+            pipe.expire(key, 3600)
+            pipe.execute()
+
 def update_task_progress(task_id, current, total, status):
     """Update task progress in Redis"""
     progress_data = {
@@ -30,9 +61,9 @@ def update_task_progress(task_id, current, total, status):
         'status': status,
         'timestamp': time.time()
     }
-    redis_client.setex(f"task_progress:{task_id}", 3600, json.dumps(progress_data))
+    redis_client.setex(f"task_progress:{task_id}", 3600, orjson.dumps(progress_data))
 
-@celery.task(bind=True, base=CallbackTask)
+@celery.task(bind=True, base=CallbackTask, name='sync_infoblox_task')
 def sync_infoblox_task(self, data):
     """Background task for InfoBlox synchronization"""
     try:
@@ -42,7 +73,7 @@ def sync_infoblox_task(self, data):
     except Exception as e:
         return {'status': 'error', 'message': str(e)}
 
-@celery.task(bind=True, base=CallbackTask)
+@celery.task(bind=True, base=CallbackTask, name='compare_data_task')
 def compare_data_task(self, data):
     """Background task for data comparison"""
     try:
@@ -52,7 +83,7 @@ def compare_data_task(self, data):
     except Exception as e:
         return {'status': 'error', 'message': str(e)}
 
-@celery.task(bind=True, base=CallbackTask)
+@celery.task(bind=True, base=CallbackTask, name='sync_data_task')
 def sync_data_task(self, data):
     """Background task for data synchronization"""
     try:
@@ -62,7 +93,81 @@ def sync_data_task(self, data):
     except Exception as e:
         return {'status': 'error', 'message': str(e)}
 
-@celery.task(bind=True, base=CallbackTask)
+async def _import_networks(task, config, networks, network_view, import_id=None, import_total=None,
+                           existing=None):
+    """Upsert networks in multi-object chunks, reporting progress as each chunk finishes
+    
+    When the task is one part of a split import, progress and spilled errors are recorded
+    under import_id (the id the client polls), with progress counted against import_total.
+    existing (subnet -> InfoBlox record, from the route's scan of the view) replaces each
+    chunk's lookup request; without it every chunk looks its own subnets up.
+    """
+    results = {
+        'created': 0,
+        'updated': 0,
+        'failed': 0,
+        'errors': [],
+        'error_count': 0
+    }
+    
+    total = len(networks)
+    progress_id = import_id or task.request.id
+    chunks = [
+        [
+            {
+                'subnet': network['subnet'],
+                'comment': f"AWS Account: {network.get('account', '')}, Region: {network.get('region', '')}",
+                'extattrs': network.get('mapped_extattrs', {})
+            }
+            for network in networks[start:start + BULK_CHUNK_SIZE]
+        ]
+        for start in range(0, total, BULK_CHUNK_SIZE)
+    ]
+    # Bounds in-flight chunks; the client's rate limiter paces requests against InfoBlox
+    sem = asyncio.Semaphore(IMPORT_CONCURRENCY)
+    
+    async with InfobloxWAPIAsync(config['host'], config['username'], config['password']) as client:
+        async def upsert_chunk(chunk):
+            async with sem:
+                return len(chunk), await client.bulk_upsert(chunk, network_view, existing)
+        
+        done = 0
+        last_update = 0.0
+        for next_result in asyncio.as_completed([upsert_chunk(chunk) for chunk in chunks]):
+            size, chunk_results = await next_result
+            done += size
+            for key in ('created', 'updated', 'failed'):
+                results[key] += chunk_results[key]
+            record_errors(results, chunk_results['errors'], progress_id)
+            
+            if import_id:
+                # Sibling tasks share one counter so the reported progress covers the whole import
+                key = f"import_progress:{import_id}"
+                with redis_client.pipeline(transaction=False) as pipe:
+                    pipe.incrby(key, size)
+                    pipe.expire(key, 3600)
+                    current, _ = pipe.execute()
+                overall = import_total
+            else:
+                current, overall = done, total
+            
+            # Update progress, at most once per PROGRESS_INTERVAL and always for the last chunk
+            now = time.monotonic()
+            if now - last_update >= PROGRESS_INTERVAL or done == total:
+                task.update_state(
+                    task_id=progress_id,
+                    state='PROGRESS',
+                    meta={
+                        'current': current,
+                        'total': overall,
+                        'status': f'Processed {current} of {overall} networks'
+                    }
+                )
+                last_update = now
+    
+    return results
+
+@celery.task(bind=True, base=CallbackTask, name='import_networks_task')
 def import_networks_task(self, data):
     """Background task for importing networks to InfoBlox"""
     try:
@@ -75,64 +180,16 @@ def import_networks_task(self, data):
         if not config_str:
             raise Exception('InfoBlox not configured')
         
-        config = json.loads(config_str)
-        client = InfobloxWAPI(config['host'], config['username'], config['password'])
+        config = orjson.loads(config_str)
         
         # Apply attribute mappings
         mapper = AttributeMapper()
         networks = mapper.apply_mappings(networks, attribute_mappings)
         
-        results = {
-            'created': 0,
-            'updated': 0,
-            'failed': 0,
-            'errors': []
-        }
-        
-        total = len(networks)
-        
-        for i, network in enumerate(networks):
-            try:
-                # Update progress
-                self.update_state(
-                    state='PROGRESS',
-                    meta={
-                        'current': i + 1,
-                        'total': total,
-                        'status': f'Processing network {network["subnet"]}'
-                    }
-                )
-                
-                subnet = network['subnet']
-                extattrs = network.get('mapped_extattrs', {})
-                comment = f"AWS Account: {network['account']}, Region: {network['region']}"
-                
-                # Check if network exists
-                existing = client.get_network_by_subnet(subnet, network_view)
-                
-                if existing:
-                    # Update existing network
-                    success = client.update_network(existing['_ref'], extattrs=extattrs)
-                    if success:
-                        results['updated'] += 1
-                    else:
-                        results['failed'] += 1
-                        results['errors'].append(f"Failed to update {subnet}")
-                else:
-                    # Create new network
-                    success = client.create_network(subnet, network_view, comment, extattrs)
-                    if success:
-                        results['created'] += 1
-                    else:
-                        results['failed'] += 1
-                        results['errors'].append(f"Failed to create {subnet}")
-                
-                # Rate limiting to avoid overwhelming InfoBlox
-                time.sleep(0.1)
-                
-            except Exception as e:
-                results['failed'] += 1
-                results['errors'].append(f"Error processing {network.get('subnet', 'unknown')}: {str(e)}")
+        results = asyncio.run(_import_networks(
+            self, config, networks, network_view,
+            data.get('import_id'), data.get('import_total'), data.get('existing')
+        ))
         
         return results
         
@@ -143,11 +200,42 @@ def import_networks_task(self, data):
         )
         raise
 
+@celery.task(bind=True, name='merge_import_results_task')
+def merge_import_results_task(self, chunk_results):
+    """Combine the results of an import split across several tasks"""
+    results = {
+        'created': 0,
+        'updated': 0,
+        'failed': 0,
+        'errors': [],
+        'error_count': 0
+    }
+    
+    for chunk in chunk_results:
+        results['created'] += chunk.get('created', 0)
+        results['updated'] += chunk.get('updated', 0)
+        results['failed'] += chunk.get('failed', 0)
+        chunk_errors = chunk.get('errors', [])
+        # This task's id is the import_id the chunks spilled under, so all overflow shares one list
+        record_errors(results, chunk_errors, self.request.id)
+        # Errors the chunk already spilled still count towards the total
+        results['error_count'] += max(chunk.get('error_count', 0) - len(chunk_errors), 0)
+    
+    return results
+
 @celery.task(bind=True)
 def process_large_file_task(self, filepath, file_type):
-    """Background task for processing large files"""
+    """Background task for processing large files
+    
+    The parsed rows are written to a zstd-compressed Parquet file and only its path is
+    returned; read them back with pyarrow.parquet.read_table(path).to_pylist().
+    """
     try:
+        import os
         import pandas as pd
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+        import pyarrow.parquet as pq
         
         # Update progress
         self.update_state(
@@ -156,30 +244,29 @@ def process_large_file_task(self, filepath, file_type):
         )
         
         if file_type == 'csv':
-            # Process CSV in chunks
-            chunk_size = 10000
-            chunks = []
-            
-            for i, chunk in enumerate(pd.read_csv(filepath, chunksize=chunk_size)):
-                chunks.append(chunk)
-                progress = min(50 + (i * 10), 90)
-                self.update_state(
-                    state='PROGRESS',
-                    meta={'current': progress, 'total': 100, 'status': f'Processing chunk {i+1}...'}
-                )
-            
-            df = pd.concat(chunks, ignore_index=True)
+            # Multi-threaded Arrow parse in one pass, no chunk list or concat
+            table = pacsv.read_csv(
+                filepath,
+                read_options=pacsv.ReadOptions(block_size=8 << 20, use_threads=True)
+            )
         else:
-            df = pd.read_excel(filepath)
+            df = pd.read_excel(filepath, engine='calamine')
+            # Excel columns often mix numbers and text (e.g. IDs); Arrow needs one type per column
+            mixed = df.select_dtypes(include='object').columns
+            df[mixed] = df[mixed].astype('string')
+            table = pa.Table.from_pandas(df, preserve_index=False)
         
         self.update_state(
             state='PROGRESS',
             meta={'current': 95, 'total': 100, 'status': 'Finalizing...'}
         )
         
-        data = df.to_dict(orient='records')
+        # Kept next to the uploads so cleanup_old_files expires it with them
+        os.makedirs('uploads', exist_ok=True)
+        out_path = os.path.join('uploads', f"{self.request.id}.parquet")
+        pq.write_table(table, out_path, compression='zstd')
         
-        return {'status': 'success', 'data': data, 'rows': len(data)}
+        return {'status': 'success', 'path': out_path, 'rows': table.num_rows}
         
     except Exception as e:
         self.update_state(
@@ -218,19 +305,31 @@ def sync_infoblox_cache():
         if not config_str:
             return
         
-        config = json.loads(config_str)
+        config = orjson.loads(config_str)
         client = InfobloxWAPI(config['host'], config['username'], config['password'])
         
-        # Refresh network views
-        views = client.get_network_views()
-        redis_client.setex('cache:network_views', 600, json.dumps(views))
+        # Fetch network views and extensible attributes concurrently; the shared session is
+        # thread-safe and each request blocks on its own pooled connection
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            views_future = pool.submit(client.get_network_views)
+            attrs_future = pool.submit(client.get_extensible_attributes)
+            views, attrs = views_future.result(), attrs_future.result()
+        
+        # The getters return [] on any error; keep the current entries rather than caching
+        # an outage for ten minutes
+        fresh = {'network_views': views, 'extensible_attributes': attrs}
+        fresh = {name: value for name, value in fresh.items() if value}
+        if not fresh:
+            return
         
-        # Refresh extensible attributes
-        attrs = client.get_extensible_attributes()
-        redis_client.setex('cache:extensible_attributes', 600, json.dumps(attrs))
+        # Refresh the same keys and encoding the API reads, in one round trip
+        with redis_client.pipeline(transaction=False) as pipe:
+            for name, value in fresh.items():
+                pipe.setex(cache_key(name), 600, pack_cache(value))
+            pipe.execute()
         
     except Exception as e:
-        print(f"Cache sync error: {e}")
+        logger.error("Cache sync error: %s", e)
 
 # Configure periodic tasks
 from celery.schedules import crontab
@@ -7,16 +7,16 @@ from hypercorn.asyncio import serve
 
 app = create_app()
 
-def find_available_port(start_port=5000, max_attempts=100):
-    """Find an available port starting from start_port"""
-    for port in range(start_port, start_port + max_attempts):
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-            try:
-                sock.bind(('', port))
-                return port
-            except OSError:
-                continue
-    raise RuntimeError(f"Could not find available port in range {start_port}-{start_port + max_attempts}")
+def find_available_port(start_port=5000):
+    """Return start_port if it is free, otherwise a port chosen by the kernel"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind(('', start_port))
+            return start_port
+        except OSError:
+            sock.bind(('', 0))
+            return sock.getsockname()[1]
 
 async def main():
     """Main async entry point"""
@@ -0,0 +1,51 @@
+"""NetworkSchema subnet validation must agree with the ipaddress-based rules it replaced"""
+import ipaddress
+import unittest
+
+from marshmallow import ValidationError
+
+from app.schemas import NetworkSchema
+
+def reference_is_valid(value):
+    """The original ipaddress-based validate_subnet"""
+    try:
+        network = ipaddress.ip_network(value, strict=False)
+    except ValueError:
+        return False
+    if network.prefixlen < 8 or network.prefixlen > 32:
+        return False
+    return not (network.is_reserved or network.is_multicast)
+
+CASES = [
+    '10.0.0.0/8', '10.0.0.0/24', '10.1.2.3/24', '192.168.1.0/32', '0.0.0.0/8',
+    '255.255.255.255/32', '224.0.0.0/8', '239.255.0.0/16', '240.0.0.0/8',
+    '223.255.255.0/24', '10.0.0.0/7', '10.0.0.0/33', '10.0.0.0/08', '256.0.0.0/8',
+    '010.0.0.0/8', '10.0.0/8', '10.0.0.0.0/8', '10.0.0.0', '10.0.0.0/', '/24',
+    '10..0.0/8', '+1.0.0.0/8', ' 1.0.0.0/8', '10.0.0.0/ 8', '1_0.0.0.0/8',
+    # Non-ASCII digits: accepted by \d and int(), rejected by ipaddress
+    '١.2.3.4/32', '10.0.0.0/٨', '１０.0.0.0/8', '10.0.0.0/2٤',
+]
+
+class ValidateSubnetTest(unittest.TestCase):
+    def setUp(self):
+        self.schema = NetworkSchema()
+
+    def is_valid(self, value):
+        try:
+            self.schema.validate_subnet(value)
+        except ValidationError:
+            return False
+        return True
+
+    def test_matches_ipaddress(self):
+        for value in CASES:
+            with self.subTest(value=value):
+                self.assertEqual(self.is_valid(value), reference_is_valid(value))
+
+    def test_rejects_non_ascii_digits(self):
+        for value in ('١.2.3.4/32', '10.0.0.0/٨'):
+            with self.subTest(value=value):
+                self.assertFalse(self.is_valid(value))
+
+if __name__ == '__main__':
+    unittest.main()